@@ -1,11 +1,50 @@
 from functools import partial
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from dict2sql.dialects.ansi.statement import Statement
-from dict2sql.dialects.ansi.utils import Utils
+from dict2sql.dialects import available_dialects, load_dialect
+
+if TYPE_CHECKING:
+    from dict2sql.dialects.ansi.utils import Utils
+    from dict2sql.guards import CostGuards
+    from dict2sql.schema import Catalog
 
 
 class dict2sql:
-    def __init__(self, utils: Optional[Utils] = None):
-        ut = utils or Utils()
-        self.to_sql = partial(Statement.to_sql_root, ut)
+    """
+    dialect names a registered dialect (see dict2sql.dialects), whose
+    compiler is imported on the first call to to_sql().
+    With a catalog, statements are validated against its schema before
+    being compiled, and dict2sql.schema.SchemaError is raised on unknown
+    tables or columns.
+    With guards, statements that break them raise dict2sql.guards.GuardError
+    instead of being compiled.
+    """
+
+    def __init__(
+        self,
+        utils: Optional["Utils"] = None,
+        dialect: str = "ansi",
+        catalog: Optional["Catalog"] = None,
+        guards: Optional["CostGuards"] = None,
+    ):
+        if dialect not in available_dialects():
+            raise ValueError(f"Unknown dialect: {dialect}")
+        self.dialect = dialect
+        self.utils = utils
+        self.catalog = catalog
+        self.guards = guards
+        self._to_sql = None
+
+    def to_sql(self, statement) -> str:
+        # Guards first: they are cheaper than validating a statement they reject
+        if self.guards is not None:
+            self.guards.check(statement)
+        if self.catalog is not None:
+            self.catalog.validate(statement)
+        if self._to_sql is None:
+            d = load_dialect(self.dialect)
+            self._to_sql = partial(d.Statement.to_sql_root, self.utils or d.Utils())
+        sql = self._to_sql(statement)
+        if self.guards is not None:
+            self.guards.check_sql(sql)
+        return sql
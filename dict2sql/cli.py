@@ -0,0 +1,150 @@
+"""
+Command-line compiler: reads newline-delimited JSON statements and writes
+one compiled statement per input line.
+
+    python -m dict2sql [--dialect NAME] [--format sql|json] [--workers N] [--stats] [FILE ...]
+
+With no FILE, or when FILE is -, statements are read from stdin. Lines that
+fail to compile are reported on stderr as FILE:LINE: error and left out of
+the output. Files that cannot be read are reported as FILE: error, and the
+remaining inputs are still compiled. The exit status is 1 if anything
+failed.
+
+The json format writes a [sql, params] array per line. Literals are inlined
+by the compiler, so params is always empty, but the framing stays exact
+even when literals contain newlines.
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from typing import IO, Any, Iterator, List, Optional, Tuple, Union
+
+from dict2sql.dialects import available_dialects, load_dialect
+
+_BUFFER_SIZE = 1 << 20
+
+# (source name, line number, raw line), or (source name, 0, error) when
+# the source cannot be read
+_Line = Tuple[str, int, Union[bytes, OSError]]
+# (source name, line number, compiled output or None, error or None)
+_Result = Tuple[str, int, Optional[bytes], Optional[str]]
+
+# Set by _init_worker, in each process
+_statement: Any = None
+_utils: Any = None
+_format = "sql"
+
+
+def _init_worker(output_format: str, dialect: str):
+    global _statement, _utils, _format
+    loaded = load_dialect(dialect)
+    _statement, _utils = loaded.Statement, loaded.Utils()
+    _format = output_format
+
+
+def _compile_line(line: _Line) -> _Result:
+    name, lineno, raw = line
+    if isinstance(raw, OSError):
+        return name, lineno, None, f"{type(raw).__name__}: {raw.strerror or raw}"
+    try:
+        sql = _statement.to_sql_root(_utils, json.loads(raw))
+    except Exception as e:
+        return name, lineno, None, f"{type(e).__name__}: {e}"
+    if _format == "json":
+        out = json.dumps([sql, []], ensure_ascii=False) + "\n"
+    else:
+        out = sql + ";\n"
+    return name, lineno, out.encode("utf-8"), None
+
+
+def _read_lines(sources: List[str], stdin: IO[bytes]) -> Iterator[_Line]:
+    for name in sources:
+        try:
+            f = stdin if name == "-" else open(name, "rb", buffering=_BUFFER_SIZE)
+        except OSError as e:
+            yield name, 0, e
+            continue
+        try:
+            for lineno, raw in enumerate(f, 1):
+                if raw.strip():
+                    yield name, lineno, raw
+        except OSError as e:
+            yield name, 0, e
+        finally:
+            if f is not stdin:
+                f.close()
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m dict2sql", description="Compile NDJSON statements to SQL.")
+    parser.add_argument("files", nargs="*", default=["-"], help="input files, - for stdin (default)")
+    parser.add_argument("--dialect", choices=available_dialects(), default="ansi", help="SQL dialect (default: ansi)")
+    parser.add_argument("--format", choices=["sql", "json"], default="sql", help="output format (default: sql)")
+    parser.add_argument("--workers", type=_positive_int, default=1, help="number of compiler processes (default: 1)")
+    parser.add_argument("--chunk-size", type=_positive_int, default=1024, help="lines sent to a worker at once")
+    parser.add_argument("--stats", action="store_true", help="print a throughput summary on stderr")
+    return parser
+
+
+def main(
+    argv: Optional[List[str]] = None,
+    stdin: Optional[IO[bytes]] = None,
+    stdout: Optional[IO[bytes]] = None,
+    stderr: Optional[IO[str]] = None,
+) -> int:
+    args = _parser().parse_args(argv)
+    input_stream: IO[bytes] = stdin or sys.stdin.buffer
+    output: IO[bytes] = stdout or sys.stdout.buffer
+    messages: IO[str] = stderr or sys.stderr
+
+    start = time.perf_counter()
+    lines = _read_lines(args.files, input_stream)
+    pool = None
+    if args.workers > 1:
+        # imap hands results back in input order
+        pool = multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(args.format, args.dialect))
+        results: Iterator[_Result] = pool.imap(_compile_line, lines, args.chunk_size)
+    else:
+        _init_worker(args.format, args.dialect)
+        results = map(_compile_line, lines)
+
+    compiled = errors = 0
+    pending: List[bytes] = []
+    try:
+        for name, lineno, out, error in results:
+            if error is not None:
+                errors += 1
+                location = f"{name}:{lineno}" if lineno else name
+                print(f"{location}: {error}", file=messages)
+                continue
+            # Without an error there is always an output
+            assert out is not None
+            compiled += 1
+            pending.append(out)
+            if len(pending) >= args.chunk_size:
+                output.write(b"".join(pending))
+                pending = []
+        output.write(b"".join(pending))
+        output.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if args.stats:
+        seconds = time.perf_counter() - start
+        rate = compiled / seconds if seconds else 0.0
+        print(
+            f"compiled={compiled} errors={errors} seconds={seconds:.3f} statements_per_second={rate:.0f}",
+            file=messages,
+        )
+    return 1 if errors else 0
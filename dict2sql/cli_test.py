@@ -0,0 +1,92 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import dict2sql
+from dict2sql.cli import main
+
+_STATEMENTS = [
+    {"Select": ["Name"], "From": "Artist", "Limit": 1},
+    {
+        "Select": "*",
+        "From": "Album",
+        "Where": {"Op": "=", "Sx": "Title", "Dx": {"Type": "Quoted", "Expression": "a\nb"}},
+    },
+    {"Delete": {"Table": "Artist"}, "Where": {"Op": "=", "Sx": "ArtistId", "Dx": "1"}},
+]
+
+
+class TestCli(unittest.TestCase):
+    def _main(self, argv, lines):
+        stdin = io.BytesIO("".join(line + "\n" for line in lines).encode("utf-8"))
+        stdout, stderr = io.BytesIO(), io.StringIO()
+        status = main(argv, stdin, stdout, stderr)
+        return status, stdout.getvalue().decode("utf-8"), stderr.getvalue()
+
+    def test_sql(self):
+        compiler = dict2sql.dict2sql()
+        status, out, err = self._main([], [json.dumps(s) for s in _STATEMENTS])
+        self.assertEqual(status, 0)
+        self.assertEqual(err, "")
+        self.assertEqual(out, "".join(compiler.to_sql(s) + ";\n" for s in _STATEMENTS))
+
+    def test_json_with_workers(self):
+        compiler = dict2sql.dict2sql()
+        statements = _STATEMENTS * 50
+        status, out, _ = self._main(
+            ["--format", "json", "--workers", "2", "--chunk-size", "7"], [json.dumps(s) for s in statements]
+        )
+        self.assertEqual(status, 0)
+        # One line per statement, in input order
+        self.assertEqual(
+            [json.loads(line) for line in out.splitlines()], [[compiler.to_sql(s), []] for s in statements]
+        )
+
+    def test_dialect(self):
+        returning = {"Delete": {"Table": "Artist"}, "Returning": "ArtistId"}
+        expected = dict2sql.dict2sql(dialect="sqlite").to_sql(returning) + ";\n"
+        for workers in ("1", "2"):
+            status, out, err = self._main(["--dialect", "sqlite", "--workers", workers], [json.dumps(returning)])
+            self.assertEqual((status, out, err), (0, expected, ""))
+        # ANSI has no Returning
+        status, out, err = self._main([], [json.dumps(returning)])
+        self.assertEqual((status, out), (1, ""))
+        self.assertTrue(err.startswith("-:1: ValueError"))
+
+    def test_errors_and_stats(self):
+        lines = [json.dumps(_STATEMENTS[0]), "{not json", "", json.dumps({"Nope": 1}), json.dumps(_STATEMENTS[2])]
+        status, out, err = self._main(["--stats"], lines)
+        self.assertEqual(status, 1)
+        self.assertEqual(len(out.splitlines()), 2)
+        err_lines = err.splitlines()
+        self.assertTrue(err_lines[0].startswith("-:2: JSONDecodeError"))
+        self.assertTrue(err_lines[1].startswith("-:4: ValueError"))
+        self.assertTrue(err_lines[2].startswith("compiled=2 errors=2 "))
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, statement in enumerate(_STATEMENTS):
+                paths.append(os.path.join(tmp, f"{i}.ndjson"))
+                with open(paths[-1], "w") as f:
+                    f.write(json.dumps(statement) + "\n")
+            status, out, _ = self._main(["--format", "json"] + paths, [])
+        self.assertEqual(status, 0)
+        self.assertEqual(len(out.splitlines()), 3)
+
+    def test_missing_file(self):
+        missing = os.path.join(tempfile.gettempdir(), "dict2sql-missing.ndjson")
+        for workers in ("1", "2"):
+            status, out, err = self._main(["--workers", workers, "-", missing], [json.dumps(_STATEMENTS[0])])
+            self.assertEqual(status, 1)
+            # The statements read before the missing file are written
+            self.assertEqual(len(out.splitlines()), 1)
+            self.assertEqual(err, f"{missing}: FileNotFoundError: No such file or directory\n")
+
+    def test_invalid_arguments(self):
+        for argv in (["--workers", "0"], ["--chunk-size", "-1"], ["--dialect", "nosuch"]):
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                self._main(argv, [])
@@ -22,15 +22,17 @@ from dict2sql.utils import Utils
 
 class Rule(abc.ABC):
     @classmethod
-    @abc.abstractclassmethod
+    @abc.abstractmethod
     def to_sql(cls, u: Utils, clause: Any) -> t.Intermediate:
         return ""
 
 
 class BaseAlternativeChild(Rule, abc.ABC):
     @staticmethod
-    @abc.abstractstaticmethod
-    def match(clause: Any) -> bool:
+    @abc.abstractmethod
+    # Positional-only (double underscore), as the matchers are the predicates of
+    # dict2sql.types, whose parameter names vary
+    def match(__clause: Any) -> bool:
         return False
 
 
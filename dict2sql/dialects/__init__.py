@@ -0,0 +1,58 @@
+"""
+Registry of the SQL dialects dict2sql can compile to.
+
+A dialect is registered by the dotted paths of its Statement and Utils
+classes, and its modules are imported only when the dialect is first loaded.
+This keeps `import dict2sql` cheap for programs that only need the types or
+that end up compiling a single dialect.
+"""
+import importlib
+from typing import Any, Dict, NamedTuple, Tuple
+
+_ANSI_STATEMENT = "dict2sql.dialects.ansi.statement:Statement"
+
+# name -> (Statement path, Utils path), as "module:attribute"
+_registry: Dict[str, Tuple[str, str]] = {
+    "ansi": (_ANSI_STATEMENT, "dict2sql.dialects.ansi.utils:Utils"),
+    # Identifiers in double quotes and strings in single quotes, as in ANSI,
+    # their Utils only enable the extensions they support (e.g. Returning)
+    "sqlite": (_ANSI_STATEMENT, "dict2sql.dialects.sqlite.utils:Utils"),
+    "postgres": (_ANSI_STATEMENT, "dict2sql.dialects.postgres.utils:Utils"),
+}
+
+
+class Dialect(NamedTuple):
+    name: str
+    Statement: Any
+    Utils: Any
+
+
+_loaded: Dict[str, Dialect] = {}
+
+
+def register_dialect(name: str, statement: str, utils: str):
+    """
+    Make a dialect available under name. statement and utils are the
+    "module:attribute" paths of its Statement and Utils classes.
+    """
+    _registry[name] = (statement, utils)
+    _loaded.pop(name, None)
+
+
+def available_dialects():
+    return sorted(_registry)
+
+
+def _import(path: str) -> Any:
+    module, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def load_dialect(name: str) -> Dialect:
+    "Import the modules of dialect name, once."
+    if name not in _loaded:
+        if name not in _registry:
+            raise ValueError(f"Unknown dialect: {name}, available: {', '.join(available_dialects())}")
+        statement, utils = _registry[name]
+        _loaded[name] = Dialect(name, _import(statement), _import(utils))
+    return _loaded[name]
@@ -15,6 +15,18 @@ class _FromClauseSingle(comp.BaseAlternativeChild):
         return u.format_identifier(clause)
 
 
+class _FromClauseTableAlias(comp.BaseAlternativeChild):
+    match = t.isTableAlias
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.TableAlias) -> t.Intermediate:
+        return [
+            u.format_identifier(clause["Table"]),
+            "AS",
+            u.sanitizer(clause["Alias"]),
+        ]
+
+
 class _FromClauseList(comp.BaseAlternativeChild):
     match = t.isTableNameList
 
@@ -59,6 +71,7 @@ class FromClause(comp.BaseAlternativeParentIfKey):
         _FromClauseSingle,
         _FromClauseList,
         _FromClauseSubQuery,
+        _FromClauseTableAlias,
         _FromClauseJoin,
     ]
     key = "From"
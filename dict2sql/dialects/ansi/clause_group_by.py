@@ -0,0 +1,28 @@
+import dict2sql.compiler_misc as comp
+import dict2sql.types as t
+from dict2sql.utils import Utils, interpose
+
+
+class _GroupByClauseList(comp.BaseAlternativeChild):
+    match = t.isColNameList
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.ColNameList) -> t.Intermediate:
+        return interpose(",", [u.sanitizer(x) for x in clause])
+
+
+class _GroupByClauseSingle(comp.BaseAlternativeChild):
+    match = t.isColName
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.Identifier) -> t.Intermediate:
+        return _GroupByClauseList.to_sql(u, [clause])
+
+
+class GroupByClause(comp.BaseAlternativeParentIfKey):
+    alternatives = [_GroupByClauseSingle, _GroupByClauseList]
+    key = "GroupBy"
+
+    @staticmethod
+    def wrapper(u: Utils, clause: t.Intermediate):
+        return ["GROUP BY", clause]
@@ -0,0 +1,34 @@
+import dict2sql.compiler_misc as comp
+import dict2sql.types as t
+from dict2sql.utils import Utils, interpose
+
+
+class _ReturningClauseList(comp.BaseAlternativeChild):
+    match = t.isColNameList
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.ColNameList) -> t.Intermediate:
+        if not clause:
+            raise ValueError("Returning without columns")
+        return interpose(",", [u.sanitizer(x) for x in clause])
+
+
+class _ReturningClauseSingle(comp.BaseAlternativeChild):
+    match = t.isColName
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.Identifier) -> t.Intermediate:
+        return _ReturningClauseList.to_sql(u, [clause])
+
+
+# Not ANSI SQL, only compiled for the dialects whose Utils enable it:
+# SQLite (since 3.35) and PostgreSQL.
+class ReturningClause(comp.BaseAlternativeParentIfKey):
+    alternatives = [_ReturningClauseSingle, _ReturningClauseList]
+    key = "Returning"
+
+    @staticmethod
+    def wrapper(u: Utils, clause: t.Intermediate):
+        if not u.supports_returning:
+            raise ValueError("Returning is not supported by this dialect, use the sqlite or postgres one")
+        return ["RETURNING", clause]
@@ -2,26 +2,39 @@ import dict2sql.compiler_misc as comp
 import dict2sql.types as t
 from dict2sql.utils import Utils, interpose
 
+from . import clause_where
 
-class _SelectClauseList(comp.BaseAlternativeChild):
-    match = t.isColNameList
+
+class _SelectClauseColumn(comp.BaseAlternativeChild):
+    match = t.isColName
 
     @classmethod
-    def to_sql(cls, u: Utils, clause: t.ColNameList) -> t.Intermediate:
+    def to_sql(cls, u: Utils, clause: t.Identifier) -> t.Intermediate:
         # No Col name
-        return interpose(",", [u.sanitizer(x) for x in clause])
+        return u.sanitizer(clause)
 
 
-class _SelectClauseSingle(comp.BaseAlternativeChild):
-    match = t.isColName
+class _SelectClauseAggregate(comp.BaseAlternativeChild):
+    match = t.isAggregate
 
     @classmethod
-    def to_sql(cls, u: Utils, clause: t.Identifier) -> t.Intermediate:
-        return _SelectClauseList.to_sql(u, [clause])
+    def to_sql(cls, u: Utils, clause: t.Aggregate) -> t.Intermediate:
+        return [
+            clause_where.ExpressionAggregate.to_sql(u, clause),
+            ["AS", u.sanitizer(clause["Alias"])] if "Alias" in clause else [],
+        ]
+
+
+class _SelectClauseList(comp.BaseAlternativeChild):
+    match = t.isColNameList
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.SelectClause) -> t.Intermediate:
+        return interpose(",", [SelectClause.test_alternatives(u, x) for x in clause])
 
 
 class SelectClause(comp.BaseAlternativeParentIfKey):
-    alternatives = [_SelectClauseSingle, _SelectClauseList]
+    alternatives = [_SelectClauseColumn, _SelectClauseAggregate, _SelectClauseList]
     key = "Select"
 
     @staticmethod
@@ -4,6 +4,8 @@ import dict2sql.compiler_misc as comp
 import dict2sql.types as t
 from dict2sql.utils import Utils, interpose
 
+from . import statement_select
+
 
 class _ExpressionLiteralSimple(comp.BaseAlternativeChild):
     match = t.isExpressionLiteralSimple
@@ -29,6 +31,57 @@ class ExpressionLiteral(comp.BaseAlternativeParent, comp.BaseAlternativeChildAlw
         return cls.wrapper(u, cls.test_alternatives(u, clause))
 
 
+class ExpressionAggregate(comp.BaseAlternativeChild):
+    match = t.isAggregate
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.Aggregate) -> t.Intermediate:
+        return [
+            u.sanitizer(clause["Aggregate"]),
+            u.format_subexpr(
+                [
+                    "DISTINCT" if clause.get("Distinct") else [],
+                    u.sanitizer(clause["Expression"]),
+                ]
+            ),
+        ]
+
+
+class ExpressionScalarSubQuery(comp.BaseAlternativeChild):
+    match = t.isScalarSubQuery
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.ScalarSubQuery) -> t.Intermediate:
+        return u.format_subquery(statement_select.SelectStatement.to_sql(u, clause["Query"]))
+
+
+class ExpressionExists(comp.BaseAlternativeChild):
+    match = t.isExpressionExists
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.ExpressionExists) -> t.Intermediate:
+        return u.format_subexpr(
+            [
+                u.sanitizer(clause["Op"]),
+                u.format_subquery(statement_select.SelectStatement.to_sql(u, clause["Query"])),
+            ]
+        )
+
+
+class ExpressionIn(comp.BaseAlternativeChild):
+    match = t.isExpressionIn
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.ExpressionIn) -> t.Intermediate:
+        return u.format_subexpr(
+            [
+                WhereClause.test_alternatives(u, clause["Sx"]),
+                u.sanitizer(clause["Op"]),
+                u.format_subquery(statement_select.SelectStatement.to_sql(u, clause["Query"])),
+            ]
+        )
+
+
 class ExpressionBoolean(comp.BaseAlternativeChild):
     match = t.isExpressionBoolean
 
@@ -60,9 +113,27 @@ class WhereClause(comp.BaseAlternativeParentIfKey):
     # TODO: Warning in this case the order matters in the list of alternatives/
     # (_ExpressionLiteral has to be last because it always matches)
     # is that ok? if yes, how to make this fact more explicit?
-    alternatives = [ExpressionBoolean, ExpressionSxDx, ExpressionLiteral]
+    alternatives = [
+        ExpressionBoolean,
+        ExpressionSxDx,
+        ExpressionExists,
+        ExpressionIn,
+        ExpressionAggregate,
+        ExpressionScalarSubQuery,
+        ExpressionLiteral,
+    ]
     key = "Where"
 
     @staticmethod
     def wrapper(u: Utils, clause: t.Intermediate):
         return ["WHERE", clause]
+
+
+class HavingClause(comp.BaseAlternativeParentIfKey):
+    # Same expressions as WHERE, typically comparing aggregates
+    alternatives = WhereClause.alternatives
+    key = "Having"
+
+    @staticmethod
+    def wrapper(u: Utils, clause: t.Intermediate):
+        return ["HAVING", clause]
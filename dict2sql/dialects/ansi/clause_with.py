@@ -0,0 +1,53 @@
+import dict2sql.compiler_misc as comp
+import dict2sql.types as t
+from dict2sql.utils import Utils, interpose
+
+from . import statement_select
+
+
+class _CommonTableExpression:
+    @staticmethod
+    def to_sql(u: Utils, clause: t.CommonTableExpression) -> t.Intermediate:
+        query = statement_select.SelectStatement.to_sql(u, clause["Query"])
+        if "Recursive" in clause:
+            query = [
+                query,
+                u.sanitizer(clause.get("Union", "UNION ALL")),
+                statement_select.SelectStatement.to_sql(u, clause["Recursive"]),
+            ]
+
+        columns = []
+        if "Columns" in clause:
+            columns = u.format_subquery(interpose(",", [u.format_identifier(x) for x in clause["Columns"]]))
+
+        materialized = []
+        if "Materialized" in clause:
+            materialized = ["MATERIALIZED"] if clause["Materialized"] else ["NOT", "MATERIALIZED"]
+
+        return [
+            u.format_identifier(clause["Name"]),
+            columns,
+            "AS",
+            materialized,
+            u.format_subquery(query),
+        ]
+
+
+class _WithClauseList(comp.BaseAlternativeChild):
+    match = t.isWithClause
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.WithClause) -> t.Intermediate:
+        return [
+            "RECURSIVE" if any("Recursive" in x for x in clause) else [],
+            interpose(",", [_CommonTableExpression.to_sql(u, x) for x in clause]),
+        ]
+
+
+class WithClause(comp.BaseAlternativeParentIfKey):
+    alternatives = [_WithClauseList]
+    key = "With"
+
+    @staticmethod
+    def wrapper(u: Utils, clause: t.Intermediate):
+        return ["WITH", clause]
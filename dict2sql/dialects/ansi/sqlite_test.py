@@ -1,13 +1,18 @@
+import sqlite3
 import unittest
 from sqlite3.dbapi2 import Connection
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 import dict2sql
 import dict2sql.types as t
 from dict2sql.test_fixtures.utils import open_sqlite_in_memory
 
+_BEFORE_3_35 = sqlite3.sqlite_version_info < (3, 35, 0)
+
 
 class _BaseTestQueryResult(unittest.TestCase):
+    dialect = "ansi"
+
     def _run_query(
         self,
         query: t.Statement,
@@ -15,7 +20,7 @@ class _BaseTestQueryResult(unittest.TestCase):
     ):
         db = provided_db or open_sqlite_in_memory()
         cur = db.cursor()
-        t = dict2sql.dict2sql()
+        t = dict2sql.dict2sql(dialect=self.dialect)
         sql = t.to_sql(query)
         return list(cur.execute(sql))
 
@@ -76,6 +81,20 @@ class TestSelect(_BaseTestQueryResult):
         expectedRes = [("Aaron",)]
         self._run_query_and_check_result(query, expectedRes)
 
+    def test_where_raw_predicates(self):
+        db = open_sqlite_in_memory()
+        db.execute("CREATE TABLE Shift (ShiftId INTEGER, OperatorId INTEGER)")
+        db.executemany("INSERT INTO Shift VALUES (?, ?)", [(1, 7), (2, 8), (3, 7)])
+
+        # Raw predicates whose text contains "Op" are not mistaken for expressions
+        query: t.SelectStatement = {
+            "Select": ["ShiftId"],
+            "From": "Shift",
+            "Where": {"Op": "AND", "Predicates": ["OperatorId = 7", {"Op": ">", "Sx": "ShiftId", "Dx": "1"}]},
+        }
+
+        self._run_query_and_check_result(query, [(3,)], db)
+
     def test_select_star(self):
         query: t.SelectStatement = {"Select": "*", "From": "Customer", "Limit": 1}
 
@@ -124,6 +143,54 @@ class TestInsert(_BaseTestQueryResult):
         expectedRes = [(Name,)]
         self._run_query_and_check_result(selectQuery, expectedRes, db)
 
+    def test_insert_multiple_columns(self):
+        db = open_sqlite_in_memory()
+
+        insertQuery: t.InsertStatement = {"Insert": {"Table": "Artist", "Data": {"Name": "Yello", "ArtistId": "1000"}}}
+        selectQuery: t.SelectStatement = {
+            "Select": ["ArtistId", "Name"],
+            "From": "Artist",
+            "Where": {"Op": "=", "Sx": "ArtistId", "Dx": "1000"},
+        }
+
+        self._run_query(insertQuery, db)
+
+        self._run_query_and_check_result(selectQuery, [(1000, "Yello")], db)
+
+    def test_insert_multiple_rows(self):
+        db = open_sqlite_in_memory()
+
+        insertQuery: t.InsertStatement = {
+            "Insert": {
+                "Table": "Artist",
+                "Data": [{"ArtistId": "1000", "Name": "Yello"}, {"Name": "Kraftwerk", "ArtistId": "1001"}],
+            }
+        }
+        selectQuery: t.SelectStatement = {
+            "Select": ["ArtistId", "Name"],
+            "From": "Artist",
+            "Where": {"Op": ">=", "Sx": "ArtistId", "Dx": "1000"},
+        }
+
+        self._run_query(insertQuery, db)
+
+        self._run_query_and_check_result(selectQuery, [(1000, "Yello"), (1001, "Kraftwerk")], db)
+
+    def test_insert_values_are_literals(self):
+        # Values are string literals, as in Update: double quotes would name
+        # columns in PostgreSQL
+        insertQuery: t.InsertStatement = {
+            "Insert": {
+                "Table": "Artist",
+                "Data": [{"ArtistId": "1000", "Name": "Yello"}, {"Name": "Kraftwerk", "ArtistId": "1001"}],
+            }
+        }
+        expected = (
+            """INSERT INTO Artist ( "ArtistId" , "Name" ) VALUES ( '1000' , 'Yello' ) , ( '1001' , 'Kraftwerk' )"""
+        )
+        for dialect in ("ansi", "postgres"):
+            self.assertEqual(dict2sql.dict2sql(dialect=dialect).to_sql(insertQuery), expected)
+
 
 class TestUpdate(_BaseTestQueryResult):
     def test_update(self):
@@ -205,3 +272,278 @@ class TestDelete(_BaseTestQueryResult):
         self._run_query(deleteQuery, db)
 
         self._run_query_and_check_result(selectQuery, [], db)
+
+
+class TestWith(_BaseTestQueryResult):
+    @staticmethod
+    def _rock_sales() -> t.SelectStatement:
+        return {
+            "Select": ["Track.TrackId", "Track.AlbumId", "InvoiceLine.InvoiceId"],
+            "From": {
+                "Join": "INNER JOIN",
+                "Sx": "Track",
+                "Dx": "InvoiceLine",
+                "On": {"Op": "=", "Sx": "Track.TrackId", "Dx": "InvoiceLine.TrackId"},
+            },
+            "Where": {"Op": "=", "Sx": "Track.GenreId", "Dx": "1"},
+        }
+
+    def _query_plan(self, query: t.SelectStatement) -> List[str]:
+        sql = dict2sql.dict2sql(dialect=self.dialect).to_sql(query)
+        return [row[3] for row in open_sqlite_in_memory().execute("EXPLAIN QUERY PLAN " + sql)]
+
+    @staticmethod
+    def _bought_together(sx: t.FromClauseSub, dx: t.FromClauseSub) -> t.SelectStatement:
+        return {
+            "Select": ["a.TrackId", "b.TrackId"],
+            "From": {
+                "Join": "INNER JOIN",
+                "Sx": sx,
+                "Dx": dx,
+                "On": {
+                    "Op": "AND",
+                    "Predicates": [
+                        {"Op": "=", "Sx": "a.InvoiceId", "Dx": "b.InvoiceId"},
+                        {"Op": "<", "Sx": "a.AlbumId", "Dx": "b.AlbumId"},
+                    ],
+                },
+            },
+        }
+
+    @unittest.skipIf(_BEFORE_3_35, "MATERIALIZED needs SQLite 3.35")
+    def test_shared_derived_table(self):
+        inline = self._bought_together(
+            {"Alias": "a", "Query": self._rock_sales()},
+            {"Alias": "b", "Query": self._rock_sales()},
+        )
+        with_cte = self._bought_together(
+            {"Table": "rock_sales", "Alias": "a"},
+            {"Table": "rock_sales", "Alias": "b"},
+        )
+        with_cte["With"] = [{"Name": "rock_sales", "Query": self._rock_sales(), "Materialized": True}]
+
+        expectedRes = sorted(self._run_query(inline))
+        self.assertEqual(len(expectedRes), 1436)
+        self.assertEqual(sorted(self._run_query(with_cte)), expectedRes)
+
+        # The CTE is computed once and both sides read it, where the inline
+        # derived tables each look up Track again
+        plan = self._query_plan(with_cte)
+        self.assertEqual(plan.count("MATERIALIZE rock_sales"), 1)
+        self.assertEqual(len([step for step in plan if step.startswith("SEARCH Track ")]), 1)
+        self.assertEqual(len([step for step in self._query_plan(inline) if step.startswith("SEARCH Track ")]), 2)
+
+    def test_recursive(self):
+        query: t.SelectStatement = {
+            "With": [
+                {
+                    "Name": "chain",
+                    "Columns": ["EmployeeId", "Depth"],
+                    "Query": {
+                        "Select": ["EmployeeId", "0"],
+                        "From": "Employee",
+                        "Where": {"Op": "=", "Sx": "EmployeeId", "Dx": "2"},
+                    },
+                    "Recursive": {
+                        "Select": ["Employee.EmployeeId", "chain.Depth + 1"],
+                        "From": {
+                            "Join": "INNER JOIN",
+                            "Sx": "Employee",
+                            "Dx": "chain",
+                            "On": {"Op": "=", "Sx": "Employee.ReportsTo", "Dx": "chain.EmployeeId"},
+                        },
+                    },
+                }
+            ],
+            "Select": ["EmployeeId", "Depth"],
+            "From": "chain",
+        }
+
+        expectedRes = [(2, 0), (3, 1), (4, 1), (5, 1)]
+        self.assertEqual(sorted(self._run_query(query)), expectedRes)
+
+    @unittest.skipIf(_BEFORE_3_35, "MATERIALIZED needs SQLite 3.35")
+    def test_delete_with(self):
+        db = open_sqlite_in_memory()
+
+        query: t.DeleteStatement = {
+            "With": [{"Name": "unused", "Query": {"Select": "ArtistId", "From": "Artist"}, "Materialized": False}],
+            "Delete": {"Table": "Artist"},
+            "Where": {"Op": "=", "Sx": "ArtistId", "Dx": "1"},
+        }
+        self._run_query(query, db)
+
+        self._run_query_and_check_result({"Select": "Name", "From": "Artist", "Limit": 1}, [("Accept",)], db)
+
+
+class TestAggregate(_BaseTestQueryResult):
+    def setUp(self):
+        # Python-side reductions over the whole table, to compare against
+        self.lines = self._run_query(
+            {"Select": ["InvoiceId", "TrackId", "UnitPrice", "Quantity"], "From": "InvoiceLine"}
+        )
+
+    def test_aggregates(self):
+        query: t.SelectStatement = {
+            "Select": [
+                {"Aggregate": "COUNT", "Expression": "*", "Alias": "n"},
+                {"Aggregate": "COUNT", "Expression": "TrackId", "Distinct": True},
+                {"Aggregate": "SUM", "Expression": "Quantity"},
+                {"Aggregate": "MIN", "Expression": "UnitPrice"},
+                {"Aggregate": "MAX", "Expression": "UnitPrice"},
+                {"Aggregate": "AVG", "Expression": "UnitPrice"},
+            ],
+            "From": "InvoiceLine",
+        }
+
+        res = self._run_query(query)
+        self.assertEqual(len(res), 1)
+        count, distinct_tracks, quantity, min_price, max_price, avg_price = res[0]
+        prices = [x[2] for x in self.lines]
+        self.assertEqual(count, len(self.lines))
+        self.assertEqual(distinct_tracks, len({x[1] for x in self.lines}))
+        self.assertEqual(quantity, sum(x[3] for x in self.lines))
+        self.assertEqual((min_price, max_price), (min(prices), max(prices)))
+        self.assertAlmostEqual(avg_price, sum(prices) / len(prices))
+
+    def test_group_by_having(self):
+        query: t.SelectStatement = {
+            "Select": [
+                "InvoiceId",
+                {"Aggregate": "COUNT", "Expression": "*", "Alias": "Lines"},
+                {"Aggregate": "SUM", "Expression": "UnitPrice", "Alias": "Total"},
+            ],
+            "From": "InvoiceLine",
+            "GroupBy": "InvoiceId",
+            "Having": {"Op": ">", "Sx": {"Aggregate": "COUNT", "Expression": "*"}, "Dx": "10"},
+        }
+
+        expected = {}
+        for invoice_id, _, price, _ in self.lines:
+            count, total = expected.get(invoice_id, (0, 0.0))
+            expected[invoice_id] = (count + 1, total + price)
+        expectedRes = sorted((k, v[0], round(v[1], 2)) for k, v in expected.items() if v[0] > 10)
+
+        res = self._run_query(query)
+        self.assertEqual(sorted((x[0], x[1], round(x[2], 2)) for x in res), expectedRes)
+        # Only the reduced rows leave the database
+        self.assertEqual((len(self.lines), len(res)), (2240, 59))
+
+
+class TestSubQueryPredicates(_BaseTestQueryResult):
+    def setUp(self):
+        self.invoices = self._run_query({"Select": ["CustomerId", "Total"], "From": "Invoice"})
+        self.customers = self._run_query({"Select": ["CustomerId", "FirstName"], "From": "Customer"})
+
+    def _big_invoices(self, total: str) -> t.SelectStatement:
+        return {
+            "Select": "1",
+            "From": "Invoice",
+            "Where": {
+                "Op": "AND",
+                "Predicates": [
+                    # Correlated with the outer query
+                    {"Op": "=", "Sx": "Invoice.CustomerId", "Dx": "Customer.CustomerId"},
+                    {"Op": ">", "Sx": "Invoice.Total", "Dx": total},
+                ],
+            },
+        }
+
+    def test_exists(self):
+        query: t.SelectStatement = {
+            "Select": ["CustomerId", "FirstName"],
+            "From": "Customer",
+            "Where": {"Op": "EXISTS", "Query": self._big_invoices("20")},
+        }
+
+        ids = {customer_id for customer_id, total in self.invoices if total > 20}
+        expectedRes = sorted(x for x in self.customers if x[0] in ids)
+        self.assertEqual(len(expectedRes), 4)
+        self.assertEqual(sorted(self._run_query(query)), expectedRes)
+
+    def test_not_exists(self):
+        query: t.SelectStatement = {
+            "Select": ["CustomerId", "FirstName"],
+            "From": "Customer",
+            "Where": {"Op": "NOT EXISTS", "Query": self._big_invoices("20")},
+        }
+
+        ids = {customer_id for customer_id, total in self.invoices if total > 20}
+        expectedRes = sorted(x for x in self.customers if x[0] not in ids)
+        self.assertEqual(sorted(self._run_query(query)), expectedRes)
+
+    def test_in(self):
+        query: t.SelectStatement = {
+            "Select": ["CustomerId", "FirstName"],
+            "From": "Customer",
+            "Where": {
+                "Op": "IN",
+                "Sx": "CustomerId",
+                "Query": {
+                    "Select": "CustomerId",
+                    "From": "Invoice",
+                    "Where": {"Op": ">", "Sx": "Total", "Dx": "20"},
+                },
+            },
+        }
+
+        ids = {customer_id for customer_id, total in self.invoices if total > 20}
+        expectedRes = sorted(x for x in self.customers if x[0] in ids)
+        self.assertEqual(sorted(self._run_query(query)), expectedRes)
+
+    def test_scalar(self):
+        query: t.SelectStatement = {
+            "Select": ["CustomerId", "Total"],
+            "From": "Invoice",
+            "Where": {
+                "Op": ">",
+                "Sx": "Total",
+                "Dx": {"Query": {"Select": {"Aggregate": "AVG", "Expression": "Total"}, "From": "Invoice"}},
+            },
+        }
+
+        average = sum(x[1] for x in self.invoices) / len(self.invoices)
+        expectedRes = sorted(x for x in self.invoices if x[1] > average)
+        self.assertEqual(sorted(self._run_query(query)), expectedRes)
+
+
+@unittest.skipIf(_BEFORE_3_35, "RETURNING needs SQLite 3.35")
+class TestReturning(_BaseTestQueryResult):
+    dialect = "sqlite"
+
+    def test_ansi(self):
+        with self.assertRaises(ValueError):
+            dict2sql.dict2sql().to_sql({"Delete": {"Table": "Genre"}, "Returning": "Name"})
+
+    def test_insert_returning(self):
+        db = open_sqlite_in_memory()
+
+        insertQuery: t.InsertStatement = {
+            "Insert": {"Table": "Artist", "Data": [{"Name": "Yello"}, {"Name": "Kraftwerk"}]},
+            "Returning": ["ArtistId", "Name"],
+        }
+
+        self._run_query_and_check_result(insertQuery, [(276, "Yello"), (277, "Kraftwerk")], db)
+
+    def test_update_returning(self):
+        db = open_sqlite_in_memory()
+
+        updateQuery: t.UpdateStatement = {
+            "Update": {"Table": "Genre", "Data": {"Name": "Metal"}},
+            "Where": {"Op": "<=", "Sx": "GenreId", "Dx": "2"},
+            "Returning": "*",
+        }
+
+        self._run_query_and_check_result(updateQuery, [(1, "Metal"), (2, "Metal")], db)
+
+    def test_delete_returning(self):
+        db = open_sqlite_in_memory()
+
+        deleteQuery: t.DeleteStatement = {
+            "Delete": {"Table": "Genre"},
+            "Where": {"Op": ">", "Sx": "GenreId", "Dx": "23"},
+            "Returning": "Name",
+        }
+
+        self._run_query_and_check_result(deleteQuery, [("Classical",), ("Opera",)], db)
+        self._run_query_and_check_result({"Select": "COUNT(*)", "From": "Genre"}, [(23,)], db)
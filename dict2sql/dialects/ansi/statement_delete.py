@@ -2,7 +2,7 @@ import dict2sql.compiler_misc as comp
 import dict2sql.types as t
 from dict2sql.utils import Utils
 
-from . import clause_where
+from . import clause_returning, clause_where, clause_with
 
 
 class _DeleteClause:
@@ -23,6 +23,8 @@ class DeleteStatement(comp.BaseAlternativeChild):
     @classmethod
     def to_sql(cls, u: Utils, clause: t.DeleteStatement) -> t.Intermediate:
         return [
+            clause_with.WithClause.to_sql(u, clause),
             _DeleteClause.to_sql(u, clause),
             clause_where.WhereClause.to_sql(u, clause),
+            clause_returning.ReturningClause.to_sql(u, clause),
         ]
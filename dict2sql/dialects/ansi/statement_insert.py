@@ -1,29 +1,58 @@
+from typing import List
+
 import dict2sql.compiler_misc as comp
 import dict2sql.types as t
-from dict2sql.utils import Utils
+from dict2sql.utils import Utils, interpose
+
+from . import clause_returning
+
+
+def _sorted_columns(clause: t.ValueMap) -> List[t.Identifier]:
+    # impart a permanent sorting onto the items
+    return sorted(clause.keys())
+
 
+class _InsertClauseMap(comp.BaseAlternativeChild):
+    match = t.isValueMap
 
-class _InsertClauseMap:
     @classmethod
     def to_sql(cls, u: Utils, clause: t.ValueMap) -> t.Intermediate:
+        return _InsertClauseRows.to_sql(u, [clause])
 
-        # impart a permanent sorting onto the items
-        items = list(clause.items())
+
+class _InsertClauseRows(comp.BaseAlternativeChild):
+    match = t.isValueMapList
+
+    @classmethod
+    def to_sql(cls, u: Utils, clause: t.ValueMapList) -> t.Intermediate:
+        if not clause:
+            raise ValueError("Insert without rows")
+        columns = _sorted_columns(clause[0])
+        for row in clause:
+            if _sorted_columns(row) != columns:
+                raise ValueError("All the rows of an Insert must have the same columns")
 
         return [
-            u.format_subquery([u.format_identifier(i[0]) for i in items]),
+            u.format_subquery(interpose(",", [u.format_identifier(x) for x in columns])),
             "VALUES",
-            u.format_subquery([u.format_identifier(i[1]) for i in items]),
+            interpose(
+                ",",
+                [u.format_subquery(interpose(",", [u.format_str_literal(row[x]) for x in columns])) for row in clause],
+            ),
         ]
 
 
+class _InsertClauseData(comp.BaseAlternativeParent):
+    alternatives = [_InsertClauseMap, _InsertClauseRows]
+
+
 class _InsertClause:
     @staticmethod
     def to_sql(u: Utils, clause: t.InsertStatement) -> t.Intermediate:
         return [
             "INSERT INTO",
             u.sanitizer(clause["Insert"]["Table"]),
-            _InsertClauseMap.to_sql(u, clause["Insert"]["Data"]),
+            _InsertClauseData.to_sql(u, clause["Insert"]["Data"]),
         ]
 
 
@@ -34,4 +63,5 @@ class InsertStatement(comp.BaseAlternativeChild):
     def to_sql(cls, u: Utils, clause: t.InsertStatement) -> t.Intermediate:
         return [
             _InsertClause.to_sql(u, clause),
+            clause_returning.ReturningClause.to_sql(u, clause),
         ]
@@ -2,7 +2,14 @@ import dict2sql.compiler_misc as comp
 import dict2sql.types as t
 from dict2sql.utils import Utils
 
-from . import clause_from, clause_limit, clause_select, clause_where
+from . import (
+    clause_from,
+    clause_group_by,
+    clause_limit,
+    clause_select,
+    clause_where,
+    clause_with,
+)
 
 
 class SelectStatement(comp.BaseAlternativeChild):
@@ -11,8 +18,11 @@ class SelectStatement(comp.BaseAlternativeChild):
     @classmethod
     def to_sql(cls, u: Utils, clause: t.SelectStatement) -> t.Intermediate:
         return [
+            clause_with.WithClause.to_sql(u, clause),
             clause_select.SelectClause.to_sql(u, clause),
             clause_from.FromClause.to_sql(u, clause),
             clause_where.WhereClause.to_sql(u, clause),
+            clause_group_by.GroupByClause.to_sql(u, clause),
+            clause_where.HavingClause.to_sql(u, clause),
             clause_limit.LimitClause.to_sql(u, clause),
         ]
@@ -1,8 +1,8 @@
 import dict2sql.compiler_misc as comp
 import dict2sql.types as t
-from dict2sql.utils import Utils
+from dict2sql.utils import Utils, interpose
 
-from . import clause_where
+from . import clause_returning, clause_where, clause_with
 
 
 class _UpdateClauseMap:
@@ -10,16 +10,19 @@ class _UpdateClauseMap:
     def to_sql(cls, u: Utils, clause: t.ValueMap) -> t.Intermediate:
 
         # impart a permanent sorting onto the items
-        items = list(clause.items())
+        items = sorted(clause.items(), key=lambda i: i[0])
 
-        return [
+        return interpose(
+            ",",
             [
-                u.format_identifier(i[0]),
-                "=",
-                u.format_str_literal(i[1]),
-            ]
-            for i in items
-        ]
+                [
+                    u.format_identifier(i[0]),
+                    "=",
+                    u.format_str_literal(i[1]),
+                ]
+                for i in items
+            ],
+        )
 
 
 class _UpdateClause:
@@ -42,6 +45,8 @@ class UpdateStatement(comp.BaseAlternativeChild):
     @classmethod
     def to_sql(cls, u: Utils, clause: t.UpdateStatement) -> t.Intermediate:
         return [
+            clause_with.WithClause.to_sql(u, clause),
             _UpdateClause.to_sql(u, clause),
             clause_where.WhereClause.to_sql(u, clause),
+            clause_returning.ReturningClause.to_sql(u, clause),
         ]
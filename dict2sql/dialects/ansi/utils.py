@@ -1,5 +1,4 @@
 import itertools
-import pprint
 from typing import Iterable, Union
 
 import dict2sql.utils as main_utils
@@ -14,6 +13,9 @@ class Utils(main_utils.Utils):
     precise control over the final output.
     """
 
+    # RETURNING is not ANSI SQL
+    supports_returning = False
+
     def __init__(self, flag_debug_produce_ir: bool = False):
         self.flag_debug_produce_ir = flag_debug_produce_ir
 
@@ -64,6 +66,8 @@ class Utils(main_utils.Utils):
 
     def format_query_list_prettyprint(self, raw: Intermediate) -> str:
         "Used for debugging"
+        import pprint
+
         pp = pprint.PrettyPrinter(depth=60)
         return pp.pformat(self._format_query_realize_intermediate_repr(raw))
 
@@ -0,0 +1,112 @@
+import datetime
+import decimal
+import re
+import unittest
+import uuid
+from typing import List, Optional
+
+import dict2sql.types as t
+from dict2sql.dialects.postgres.copy import CopyEncoder, CopyFormat, copy_from_insert
+
+_GOLDEN = "dict2sql/test_fixtures/copy_{}.golden"
+
+_COLUMNS = ["id", "name", "price", "flag", "created", "payload", "tags"]
+
+_ROWS = [
+    [1, "plain", 9.99, True, datetime.datetime(2021, 5, 1, 12, 30), b"\x00\xff", ["a", "b"]],
+    [2, "tab\there\nnewline\\backslash", decimal.Decimal("0.10"), False, datetime.date(2021, 5, 2), None, []],
+    [3, 'comma, "quote"', float("nan"), None, None, {"k": [1, 2]}, ["x y", None, 'q"']],
+    [4, "", float("-inf"), True, datetime.time(23, 59, 59), uuid.UUID(int=1), [[1, 2], [3, 4]]],
+    [5, None, 0.0, False, datetime.timedelta(days=1, seconds=2), "\\.", ["\\"]],
+    [6, "\\.", -1, None, None, "ünïcødé ✓", None],
+]
+
+_TEXT_UNESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "\\": "\\"}
+
+
+def _parse_text(payload: str) -> List[List[Optional[str]]]:
+    rows = []
+    for line in payload.split("\n")[:-1]:
+        fields = []
+        for field in line.split("\t"):
+            if field == "\\N":
+                fields.append(None)
+            else:
+                fields.append(re.sub(r"\\(.)", lambda m: _TEXT_UNESCAPES[m.group(1)], field))
+        rows.append(fields)
+    return rows
+
+
+def _parse_csv(payload: str) -> List[List[Optional[str]]]:
+    rows: List[List[Optional[str]]] = []
+    row: List[Optional[str]] = []
+    field, quoted, in_quotes, i = "", False, False, 0
+    while i < len(payload):
+        c = payload[i]
+        if in_quotes:
+            if c == '"' and payload[i + 1 : i + 2] == '"':
+                field += '"'
+                i += 1
+            elif c == '"':
+                in_quotes = False
+            else:
+                field += c
+        elif c == '"':
+            in_quotes = quoted = True
+        elif c in ",\n":
+            # An unquoted empty field is NULL
+            row.append(field if field or quoted else None)
+            field, quoted = "", False
+            if c == "\n":
+                rows.append(row)
+                row = []
+        else:
+            field += c
+        i += 1
+    return rows
+
+
+class TestCopyEncoder(unittest.TestCase):
+    def _check(self, format: CopyFormat, parse):
+        encoder = CopyEncoder(_COLUMNS, format, chunk_size=16)
+        chunks = list(encoder.iter_chunks(_ROWS))
+        self.assertTrue(all(len(chunk) == 16 for chunk in chunks[:-1]))
+        self.assertLessEqual(len(chunks[-1]), 16)
+
+        payload = b"".join(chunks)
+        with open(_GOLDEN.format(format), "rb") as f:
+            self.assertEqual(payload, f.read())
+
+        expected = [[encoder.convert(value) for value in row] for row in _ROWS]
+        self.assertEqual(parse(payload.decode("utf-8")), expected)
+
+    def test_text(self):
+        self._check("text", _parse_text)
+
+    def test_csv(self):
+        self._check("csv", _parse_csv)
+
+    def test_convert(self):
+        encoder = CopyEncoder(_COLUMNS)
+        self.assertEqual(encoder.convert(True), "t")
+        self.assertEqual(encoder.convert(float("inf")), "Infinity")
+        self.assertEqual(encoder.convert(b"\x01\xab"), "\\x01ab")
+        self.assertEqual(encoder.convert(datetime.datetime(2021, 1, 2, 3, 4, 5)), "2021-01-02 03:04:05")
+        self.assertEqual(encoder.convert(["a", None, [1]]), '{"a",NULL,{"1"}}')
+
+    def test_copy_from_insert(self):
+        statement: t.InsertStatement = {
+            "Insert": {"Table": "artist", "Data": [{"name": "a", "id": 1}, {"id": 2, "name": None}]}
+        }
+        sql, chunks = copy_from_insert(statement, "csv")
+        self.assertEqual(sql, 'COPY "artist" ("id", "name") FROM STDIN WITH (FORMAT csv)')
+        self.assertEqual(b"".join(chunks), b"1,a\n2,\n")
+
+        sql, chunks = copy_from_insert({"Insert": {"Table": "artist", "Data": {"id": 3, "name": "b"}}})
+        self.assertEqual(sql, 'COPY "artist" ("id", "name") FROM STDIN')
+        self.assertEqual(b"".join(chunks), b"3\tb\n")
+
+        with self.assertRaises(ValueError):
+            copy_from_insert({"Insert": {"Table": "artist", "Data": [{"id": 1}, {"name": "x"}]}})
+        with self.assertRaises(ValueError):
+            copy_from_insert({"Insert": {"Table": "artist", "Data": {"id": 1}}, "Returning": "id"})
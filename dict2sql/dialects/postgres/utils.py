@@ -0,0 +1,5 @@
+import dict2sql.dialects.ansi.utils as ansi_utils
+
+
+class Utils(ansi_utils.Utils):
+    supports_returning = True
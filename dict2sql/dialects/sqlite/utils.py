@@ -0,0 +1,6 @@
+import dict2sql.dialects.ansi.utils as ansi_utils
+
+
+class Utils(ansi_utils.Utils):
+    # RETURNING needs SQLite 3.35 or later
+    supports_returning = True
@@ -0,0 +1,235 @@
+"""
+Asyncio front end for running compiled statements on SQLite.
+
+sqlite3 calls block, so every pooled connection owns a single worker thread:
+the connection is created on that thread and all of its work is submitted
+there, which keeps the event loop free and satisfies sqlite3's same-thread
+check. The pool size bounds the number of concurrent queries; callers beyond
+that wait in a queue whose depth can be capped and is tracked in
+PoolMetrics.
+
+Compiled SQL is executed as-is. Literals are inlined by the compiler, so
+sqlite3's per-connection statement cache (see cached_statements) only
+reuses a prepared statement when exactly the same SQL text is issued again
+on a connection, not for statements that merely share a shape.
+"""
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Callable, List, Optional
+
+import dict2sql.types as t
+from dict2sql.dialects.ansi.statement import Statement
+from dict2sql.dialects.sqlite.utils import Utils
+
+
+class PoolFullError(Exception):
+    "Raised when too many callers are already waiting for a connection."
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"PoolMetrics(in_use={self.in_use}, peak_in_use={self.peak_in_use}, waiting={self.waiting}, "
+            f"peak_waiting={self.peak_waiting}, acquired={self.acquired}, rejected={self.rejected}, "
+            f"timeouts={self.timeouts})"
+        )
+
+
+class _PooledConnection:
+    def __init__(self, connect: Callable[[], sqlite3.Connection]):
+        self._connect = connect
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.db: Optional[sqlite3.Connection] = None
+
+    def _call(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        # Runs on the connection's own thread
+        if self.db is None:
+            self.db = self._connect()
+        return fn(self.db)
+
+    def run(self, fn: Callable[[sqlite3.Connection], Any]) -> "asyncio.Future[Any]":
+        return asyncio.get_running_loop().run_in_executor(self._executor, self._call, fn)
+
+    def interrupt(self):
+        # sqlite3.Connection.interrupt may be called from any thread
+        if self.db is not None:
+            self.db.interrupt()
+
+    async def close(self):
+        def close(db: sqlite3.Connection):
+            db.close()
+
+        if self.db is not None:
+            await self.run(close)
+        self._executor.shutdown(wait=False)
+
+
+class AsyncDatabase:
+    """
+    Run statements without blocking the event loop:
+
+        db = AsyncDatabase("file:chinook.sqlite3?mode=ro", uri=True)
+        rows = await db.fetch(statement)
+        async for row in db.stream(statement):
+            ...
+        await db.close()
+
+    Extra keyword arguments are passed to sqlite3.connect. timeout applies
+    both to waiting for a connection and to each database call; a call that
+    runs over it is interrupted and raises asyncio.TimeoutError.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        pool_size: int = 4,
+        max_waiting: Optional[int] = None,
+        timeout: Optional[float] = None,
+        utils: Optional[Utils] = None,
+        cached_statements: int = 128,
+        **connect_kwargs: Any,
+    ):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        def connect() -> sqlite3.Connection:
+            return sqlite3.connect(database, cached_statements=cached_statements, **connect_kwargs)
+
+        self.utils = utils or Utils()
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.metrics = PoolMetrics()
+        self._connections = [_PooledConnection(connect) for _ in range(pool_size)]
+        # Created on first use, so that it binds to the running event loop
+        self._idle: Optional["asyncio.Queue[_PooledConnection]"] = None
+
+    def _queue(self) -> "asyncio.Queue[_PooledConnection]":
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for connection in self._connections:
+                self._idle.put_nowait(connection)
+        return self._idle
+
+    async def _acquire(self, timeout: Optional[float]) -> _PooledConnection:
+        queue = self._queue()
+        m = self.metrics
+        if queue.empty() and self.max_waiting is not None and m.waiting >= self.max_waiting:
+            m.rejected += 1
+            raise PoolFullError(f"{m.waiting} callers already waiting for a connection")
+
+        m.waiting += 1
+        m.peak_waiting = max(m.peak_waiting, m.waiting)
+        try:
+            connection = await asyncio.wait_for(queue.get(), timeout)
+        except asyncio.TimeoutError:
+            m.timeouts += 1
+            raise
+        finally:
+            m.waiting -= 1
+
+        m.acquired += 1
+        m.in_use += 1
+        m.peak_in_use = max(m.peak_in_use, m.in_use)
+        return connection
+
+    def _release(self, connection: _PooledConnection):
+        self.metrics.in_use -= 1
+        self._queue().put_nowait(connection)
+
+    async def _run(
+        self, connection: _PooledConnection, fn: Callable[[sqlite3.Connection], Any], timeout: Optional[float]
+    ):
+        future = connection.run(fn)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            connection.interrupt()
+            raise
+
+    def _timeout(self, timeout: Optional[float]) -> Optional[float]:
+        return self.timeout if timeout is None else timeout
+
+    async def fetch(self, statement: t.Statement, timeout: Optional[float] = None) -> List[Any]:
+        "Run statement and return all the resulting rows."
+        sql = Statement.to_sql_root(self.utils, statement)
+        timeout = self._timeout(timeout)
+        connection = await self._acquire(timeout)
+        try:
+            return await self._run(connection, lambda db: db.execute(sql).fetchall(), timeout)
+        finally:
+            self._release(connection)
+
+    async def _write(self, statement: t.Statement, result: Callable[[sqlite3.Cursor], Any], timeout: Optional[float]):
+        def write(db: sqlite3.Connection) -> Any:
+            with db:
+                return result(db.execute(sql))
+
+        sql = Statement.to_sql_root(self.utils, statement)
+        timeout = self._timeout(timeout)
+        connection = await self._acquire(timeout)
+        try:
+            return await self._run(connection, write, timeout)
+        finally:
+            self._release(connection)
+
+    async def execute(self, statement: t.Statement, timeout: Optional[float] = None) -> int:
+        "Run and commit statement, return the number of affected rows."
+        return await self._write(statement, lambda cursor: cursor.rowcount, timeout)
+
+    async def stream(
+        self, statement: t.Statement, chunk_size: int = 256, timeout: Optional[float] = None
+    ) -> AsyncGenerator[Any, None]:
+        """
+        Yield the rows of statement, fetching chunk_size of them at a time.
+        The connection is held until the iteration ends.
+
+        Write statements yield the rows of their Returning clause. SQLite
+        performs the whole write, and computes all of these rows, on the first
+        step, so they are run and committed at once and the connection is
+        released before the first row is yielded.
+        """
+        if not t.isSelectStatement(statement):
+            for row in await self._write(statement, lambda cursor: cursor.fetchall(), timeout):
+                yield row
+            return
+
+        sql = Statement.to_sql_root(self.utils, statement)
+        timeout = self._timeout(timeout)
+        connection = await self._acquire(timeout)
+        try:
+            cursor: sqlite3.Cursor = await self._run(connection, lambda db: db.execute(sql), timeout)
+            try:
+                while True:
+                    rows = await self._run(connection, lambda db: cursor.fetchmany(chunk_size), timeout)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+            finally:
+                # Also reached when the iteration is cancelled or closed early,
+                # shielded so that a second cancellation cannot skip the close
+                await asyncio.shield(connection.run(lambda db: cursor.close()))
+        finally:
+            self._release(connection)
+
+    async def close(self):
+        for connection in self._connections:
+            await connection.close()
+
+    async def __aenter__(self) -> "AsyncDatabase":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
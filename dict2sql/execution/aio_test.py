@@ -0,0 +1,161 @@
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from typing import Any, List
+
+import dict2sql
+import dict2sql.types as t
+from dict2sql.execution.aio import AsyncDatabase, PoolFullError
+from dict2sql.test_fixtures.utils import copy_sqlite_to_disk, open_sqlite_in_memory
+
+_READ_ONLY = "file:dict2sql/test_fixtures/chinhook.sqlite3?mode=ro"
+
+
+def _tracks_of_album(album_id: int) -> t.SelectStatement:
+    return {
+        "Select": ["TrackId", "Name"],
+        "From": "Track",
+        "Where": {"Op": "=", "Sx": "AlbumId", "Dx": str(album_id)},
+    }
+
+
+# Large enough to run for a long time
+_SLOW_QUERY: t.SelectStatement = {"Select": "COUNT(*)", "From": ["InvoiceLine", "Track", "Customer"]}
+# 12M rows, the first of which comes at once
+_MANY_ROWS: t.SelectStatement = {
+    "Select": "a.TrackId",
+    "From": [{"Table": "Track", "Alias": "a"}, {"Table": "Track", "Alias": "b"}],
+}
+
+
+class _RecordingConnection(sqlite3.Connection):
+    "Keeps the cursors created by execute(), to check that they get closed."
+
+    cursors: List[sqlite3.Cursor] = []
+
+    def execute(self, *args: Any) -> sqlite3.Cursor:
+        cursor = super().execute(*args)
+        self.cursors.append(cursor)
+        return cursor
+
+
+def _is_closed(cursor: sqlite3.Cursor) -> bool:
+    try:
+        cursor.fetchone()
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class TestAsyncDatabase(unittest.TestCase):
+    def test_concurrent_readers(self):
+        reference = open_sqlite_in_memory()
+        compiler = dict2sql.dict2sql()
+        album_ids = list(range(1, 101))
+        expected = [list(reference.execute(compiler.to_sql(_tracks_of_album(i)))) for i in album_ids]
+
+        async def main():
+            async with AsyncDatabase(_READ_ONLY, uri=True, pool_size=4) as db:
+                results = await asyncio.gather(*[db.fetch(_tracks_of_album(i)) for i in album_ids])
+                return results, db.metrics
+
+        results, metrics = _run(main())
+        self.assertEqual(results, expected)
+        self.assertEqual(metrics.acquired, len(album_ids))
+        self.assertLessEqual(metrics.peak_in_use, 4)
+        self.assertGreater(metrics.peak_waiting, 0)
+        self.assertEqual((metrics.in_use, metrics.waiting), (0, 0))
+
+    def test_stream(self):
+        async def main():
+            async with AsyncDatabase(_READ_ONLY, uri=True, pool_size=1) as db:
+                return [row async for row in db.stream({"Select": "TrackId", "From": "Track"}, chunk_size=100)]
+
+        rows = _run(main())
+        self.assertEqual(len(rows), 3503)
+        self.assertEqual(rows[0], (1,))
+
+    def test_stream_closed_early(self):
+        async def main():
+            db = AsyncDatabase(_READ_ONLY, uri=True, pool_size=1, factory=_RecordingConnection, check_same_thread=False)
+            async with db:
+                stream = db.stream(_MANY_ROWS, chunk_size=10)
+                await stream.__anext__()
+                await stream.aclose()
+                return db.metrics.in_use, [_is_closed(c) for c in _RecordingConnection.cursors]
+
+        _RecordingConnection.cursors = []
+        self.assertEqual(_run(main()), (0, [True]))
+
+    def test_stream_cancelled(self):
+        async def main():
+            db = AsyncDatabase(_READ_ONLY, uri=True, pool_size=1, factory=_RecordingConnection, check_same_thread=False)
+            async with db:
+                # The first chunk takes a while to fetch
+                stream = db.stream(_MANY_ROWS, chunk_size=500000)
+                task = asyncio.ensure_future(stream.__anext__())
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+                return db.metrics.in_use, [_is_closed(c) for c in _RecordingConnection.cursors]
+
+        _RecordingConnection.cursors = []
+        self.assertEqual(_run(main()), (0, [True]))
+
+    @unittest.skipIf(sqlite3.sqlite_version_info < (3, 35, 0), "RETURNING needs SQLite 3.35")
+    def test_stream_returning(self):
+        insert: t.InsertStatement = {
+            "Insert": {"Table": "Artist", "Data": [{"Name": f"Stream {i}"} for i in range(3)]},
+            "Returning": "ArtistId",
+        }
+
+        async def main(path: str):
+            async with AsyncDatabase(path, pool_size=1) as db:
+                return [row async for row in db.stream(insert)], db.metrics
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = copy_sqlite_to_disk(tmp)
+            rows, metrics = _run(main(path))
+            # Committed, and visible to other connections
+            other = sqlite3.connect(path)
+            count = other.execute("SELECT COUNT(*) FROM Artist WHERE Name LIKE 'Stream %'").fetchone()[0]
+            other.close()
+
+        self.assertEqual(rows, [(276,), (277,), (278,)])
+        self.assertEqual(count, 3)
+        self.assertEqual(metrics.in_use, 0)
+
+    def test_timeout_interrupts_query(self):
+        async def main():
+            async with AsyncDatabase(_READ_ONLY, uri=True, pool_size=1) as db:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await db.fetch(_SLOW_QUERY, timeout=0.05)
+                # The connection is usable again once interrupted
+                rows = await db.fetch(_tracks_of_album(1))
+                return rows, db.metrics
+
+        rows, metrics = _run(main())
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(metrics.timeouts, 1)
+
+    def test_max_waiting(self):
+        async def main():
+            async with AsyncDatabase(_READ_ONLY, uri=True, pool_size=1, max_waiting=2) as db:
+                results = await asyncio.gather(
+                    *[db.fetch(_tracks_of_album(i)) for i in range(1, 6)], return_exceptions=True
+                )
+                return results, db.metrics
+
+        results, metrics = _run(main())
+        self.assertEqual(sum(isinstance(r, PoolFullError) for r in results), 2)
+        self.assertEqual(metrics.rejected, 2)
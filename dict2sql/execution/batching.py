@@ -0,0 +1,217 @@
+"""
+Execute long sequences of write statements in grouped transactions.
+
+Running every compiled INSERT/UPDATE/DELETE in autocommit mode costs one
+commit (and one fsync) per statement. BatchingExecutor opens a transaction,
+runs each statement inside its own savepoint and commits once the batch
+reaches a statement count, a byte size or an age limit, whichever first.
+A failing statement only rolls back its own savepoint, so it can be retried
+or skipped without losing the rest of the batch.
+
+The limits are checked when a statement runs, there is no background timer
+(a sqlite3 connection belongs to its thread). While a batch is pending its
+transaction holds SQLite's write lock, blocking every other writer, and its
+statements are lost on a crash. So when statements may stop arriving, call
+poll() periodically to commit a batch that reached max_seconds, or flush().
+"""
+
+import sqlite3
+import time
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import dict2sql.types as t
+from dict2sql.dialects.ansi.statement import Statement
+from dict2sql.dialects.sqlite.utils import Utils
+
+_SAVEPOINT = "dict2sql_batch_statement"
+
+
+class BatchFailure(NamedTuple):
+    statement: t.Statement
+    sql: str
+    error: sqlite3.Error
+
+
+class BatchStats:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        self.retries = 0
+        self.skipped = 0
+        self.seconds = 0.0
+
+    @property
+    def commits_per_second(self) -> float:
+        return self.commits / self.seconds if self.seconds else 0.0
+
+    @property
+    def statements_per_commit(self) -> float:
+        return self.statements / self.commits if self.commits else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"BatchStats(statements={self.statements}, commits={self.commits}, retries={self.retries}, "
+            f"skipped={self.skipped}, commits_per_second={self.commits_per_second:.1f}, "
+            f"statements_per_commit={self.statements_per_commit:.1f})"
+        )
+
+
+class BatchingExecutor:
+    """
+    Compiles statements with Statement.to_sql_root and runs them on db in
+    batches. Use it as a context manager (the pending batch is committed on
+    exit, or rolled back if an exception escapes), or call close() when done.
+
+    When a statement fails it is attempted again up to retries times. After
+    that it is recorded in failures and skipped if skip_failed is set,
+    otherwise the error is raised (the rest of the batch stays pending).
+    """
+
+    def __init__(
+        self,
+        db: sqlite3.Connection,
+        utils: Optional[Utils] = None,
+        max_statements: int = 1000,
+        max_bytes: int = 1 << 20,
+        max_seconds: float = 1.0,
+        retries: int = 0,
+        skip_failed: bool = True,
+    ):
+        self.db = db
+        self.utils = utils or Utils()
+        self.max_statements = max_statements
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.retries = retries
+        self.skip_failed = skip_failed
+
+        self.stats = BatchStats()
+        self.failures: List[BatchFailure] = []
+
+        # Any: the type checker only allows assigning back the documented literals
+        self._isolation_level: Any = db.isolation_level
+        # Transactions are issued explicitly from here on
+        db.isolation_level = None
+        self._batch_statements = 0
+        self._batch_bytes = 0
+        self._batch_started: Optional[float] = None
+
+    def _begin(self):
+        self.db.execute("BEGIN")
+        self._batch_statements = 0
+        self._batch_bytes = 0
+        self._batch_started = time.monotonic()
+
+    def _run(self, sql: str) -> Tuple[List[Any], Optional[sqlite3.Error]]:
+        """
+        Run sql in a savepoint, return the rows it returned and the last
+        error if every attempt failed.
+        """
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats.retries += 1
+            self.db.execute(f"SAVEPOINT {_SAVEPOINT}")
+            try:
+                # The rows have to be read before the savepoint is released
+                rows = self.db.execute(sql).fetchall()
+            except sqlite3.Error as e:
+                self.db.execute(f"ROLLBACK TO {_SAVEPOINT}")
+                self.db.execute(f"RELEASE {_SAVEPOINT}")
+                error = e
+            else:
+                self.db.execute(f"RELEASE {_SAVEPOINT}")
+                return rows, None
+        return [], error
+
+    def execute(self, statement: t.Statement) -> Optional[List[Any]]:
+        """
+        Run statement in the current batch. Returns the rows produced by its
+        Returning clause (empty without one), None if it failed and was skipped.
+        """
+        sql = Statement.to_sql_root(self.utils, statement)
+        start = time.perf_counter()
+        try:
+            if self._batch_started is None:
+                self._begin()
+
+            rows, error = self._run(sql)
+            if error is None:
+                self.stats.statements += 1
+                self._batch_statements += 1
+                self._batch_bytes += len(sql.encode("utf-8"))
+            else:
+                self.failures.append(BatchFailure(statement, sql, error))
+                if not self.skip_failed:
+                    raise error
+                self.stats.skipped += 1
+
+            if self._batch_full():
+                self._commit()
+        finally:
+            self.stats.seconds += time.perf_counter() - start
+        return rows if error is None else None
+
+    def execute_many(self, statements: Iterable[t.Statement]):
+        for statement in statements:
+            self.execute(statement)
+
+    def iter_returning(self, statements: Iterable[t.Statement]) -> Iterator[Any]:
+        """
+        Run statements like execute_many, yielding the rows returned by each
+        of them as soon as it has run. Rows are only durable once their
+        batch is committed.
+        """
+        for statement in statements:
+            yield from self.execute(statement) or []
+
+    def _batch_full(self) -> bool:
+        return (
+            self._batch_statements >= self.max_statements
+            or self._batch_bytes >= self.max_bytes
+            or time.monotonic() - (self._batch_started or 0) >= self.max_seconds
+        )
+
+    def _commit(self):
+        if self._batch_started is None:
+            return
+        self.db.execute("COMMIT")
+        self._batch_started = None
+        if self._batch_statements:
+            self.stats.commits += 1
+
+    def poll(self) -> bool:
+        """
+        Commit the pending batch if it is older than max_seconds, return
+        whether it did. To be called while no statements arrive.
+        """
+        if self._batch_started is None or time.monotonic() - self._batch_started < self.max_seconds:
+            return False
+        self.flush()
+        return True
+
+    def flush(self):
+        "Commit the pending batch, if any."
+        start = time.perf_counter()
+        try:
+            self._commit()
+        finally:
+            self.stats.seconds += time.perf_counter() - start
+
+    def rollback(self):
+        "Discard the pending batch, if any."
+        if self._batch_started is not None:
+            self.db.execute("ROLLBACK")
+            self._batch_started = None
+
+    def close(self):
+        self.flush()
+        self.db.isolation_level = self._isolation_level
+
+    def __enter__(self) -> "BatchingExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+        self.close()
@@ -0,0 +1,107 @@
+import sqlite3
+import tempfile
+import unittest
+from typing import List
+
+import dict2sql.types as t
+from dict2sql.execution.batching import BatchingExecutor
+from dict2sql.test_fixtures.utils import copy_sqlite_to_disk
+
+
+def _insert_artist(name: str) -> t.InsertStatement:
+    return {"Insert": {"Table": "Artist", "Data": {"Name": name}}}
+
+
+class TestBatchingExecutor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = copy_sqlite_to_disk(self.tmp.name)
+        self.db = sqlite3.connect(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _count_artists(self, prefix: str) -> int:
+        # Read through a separate connection, to only see committed data
+        other = sqlite3.connect(self.path)
+        try:
+            return other.execute("SELECT COUNT(*) FROM Artist WHERE Name LIKE ?", (prefix + "%",)).fetchone()[0]
+        finally:
+            other.close()
+
+    def test_commits_by_count(self):
+        with BatchingExecutor(self.db, max_statements=10, max_seconds=60) as ex:
+            ex.execute_many(_insert_artist(f"Batch {i}") for i in range(25))
+            self.assertEqual(ex.stats.commits, 2)
+            self.assertEqual(self._count_artists("Batch"), 20)
+
+        self.assertEqual(self._count_artists("Batch"), 25)
+        self.assertEqual(ex.stats.commits, 3)
+        self.assertEqual(ex.stats.statements, 25)
+        self.assertAlmostEqual(ex.stats.statements_per_commit, 25 / 3)
+        self.assertGreater(ex.stats.commits_per_second, 0)
+
+    def test_commits_by_bytes(self):
+        with BatchingExecutor(self.db, max_statements=1000, max_bytes=1, max_seconds=60) as ex:
+            ex.execute_many(_insert_artist(f"Bytes {i}") for i in range(3))
+        self.assertEqual(ex.stats.commits, 3)
+
+    def test_commits_by_time(self):
+        with BatchingExecutor(self.db, max_statements=1000, max_seconds=0) as ex:
+            ex.execute_many(_insert_artist(f"Time {i}") for i in range(3))
+        self.assertEqual(ex.stats.commits, 3)
+
+    def test_poll(self):
+        with BatchingExecutor(self.db, max_statements=1000, max_seconds=60) as ex:
+            ex.execute(_insert_artist("Poll 1"))
+            self.assertFalse(ex.poll())
+            self.assertEqual(self._count_artists("Poll"), 0)
+            ex.max_seconds = 0
+            self.assertTrue(ex.poll())
+            self.assertEqual(self._count_artists("Poll"), 1)
+            # Nothing pending
+            self.assertFalse(ex.poll())
+        self.assertEqual(ex.stats.commits, 1)
+
+    def test_failed_statement_is_skipped(self):
+        broken: t.InsertStatement = {"Insert": {"Table": "NoSuchTable", "Data": {"Name": "x"}}}
+        with BatchingExecutor(self.db, max_statements=1000, max_seconds=60, retries=2) as ex:
+            ex.execute_many([_insert_artist("Skip 1"), broken, _insert_artist("Skip 2")])
+
+        self.assertEqual(self._count_artists("Skip"), 2)
+        self.assertEqual(ex.stats.commits, 1)
+        self.assertEqual(ex.stats.skipped, 1)
+        self.assertEqual(ex.stats.retries, 2)
+        self.assertEqual([f.statement for f in ex.failures], [broken])
+
+    @unittest.skipIf(sqlite3.sqlite_version_info < (3, 35, 0), "RETURNING needs SQLite 3.35")
+    def test_iter_returning(self):
+        statements: List[t.Statement] = [
+            {
+                "Insert": {"Table": "Artist", "Data": [{"Name": "Returning 1"}, {"Name": "Returning 2"}]},
+                "Returning": ["ArtistId", "Name"],
+            },
+            {"Insert": {"Table": "NoSuchTable", "Data": {"Name": "x"}}, "Returning": "*"},
+            {
+                "Delete": {"Table": "Artist"},
+                "Where": {"Op": "=", "Sx": "Name", "Dx": {"Type": "Quoted", "Expression": "Returning 1"}},
+                "Returning": "Name",
+            },
+        ]
+        with BatchingExecutor(self.db, max_seconds=60) as ex:
+            rows = list(ex.iter_returning(statements))
+
+        self.assertEqual(rows, [(276, "Returning 1"), (277, "Returning 2"), ("Returning 1",)])
+        self.assertEqual(self._count_artists("Returning"), 1)
+        self.assertEqual(ex.stats.skipped, 1)
+
+    def test_failed_statement_raises(self):
+        broken: t.InsertStatement = {"Insert": {"Table": "NoSuchTable", "Data": {"Name": "x"}}}
+        with self.assertRaises(sqlite3.OperationalError):
+            with BatchingExecutor(self.db, max_seconds=60, skip_failed=False) as ex:
+                ex.execute_many([_insert_artist("Raise 1"), broken])
+
+        # The pending batch was rolled back
+        self.assertEqual(self._count_artists("Raise"), 0)
+        self.assertEqual(self.db.isolation_level, "")
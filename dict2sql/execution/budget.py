@@ -0,0 +1,98 @@
+"""
+Run statements on SQLite under a runtime budget.
+
+QueryBudget installs a progress handler on the connection while a
+statement runs and aborts it once it has executed more than max_steps
+virtual machine instructions or run for more than max_seconds. The abort
+surfaces as BudgetExceeded, and is counted against the shape of the
+statement (see dict2sql.fingerprint.shape_hash), so that statements which
+only differ in their literals share a counter. Once a shape reaches
+max_violations its statements are rejected without running at all, so one
+bad query generator fails fast instead of slowing down everyone else.
+"""
+import sqlite3
+import time
+from collections import Counter
+from typing import Any, Callable, List, Optional
+
+import dict2sql.types as t
+from dict2sql.dialects.ansi.statement import Statement
+from dict2sql.dialects.sqlite.utils import Utils
+from dict2sql.fingerprint import shape_hash
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, message: str, shape: str):
+        super().__init__(message)
+        self.shape = shape
+
+
+class QueryBudget:
+    """
+    The progress handler runs every check_every instructions, which bounds
+    both the overhead of the checks and the precision of max_steps.
+    """
+
+    def __init__(
+        self,
+        db: sqlite3.Connection,
+        utils: Optional[Utils] = None,
+        max_steps: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        max_violations: Optional[int] = None,
+        check_every: int = 10000,
+    ):
+        if check_every < 1:
+            raise ValueError("check_every must be positive")
+        self.db = db
+        self.utils = utils or Utils()
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.max_violations = max_violations
+        self.check_every = check_every
+        # shape_hash -> number of statements aborted
+        self.violations: Counter = Counter()
+        # shape_hash -> number of statements rejected without running
+        self.rejected: Counter = Counter()
+        self._steps = 0
+        self._deadline = 0.0
+        self._exceeded = False
+
+    def _progress(self) -> int:
+        self._steps += self.check_every
+        if self.max_steps is not None and self._steps > self.max_steps:
+            self._exceeded = True
+        elif self.max_seconds is not None and time.perf_counter() > self._deadline:
+            self._exceeded = True
+        # Non-zero interrupts the statement
+        return 1 if self._exceeded else 0
+
+    def _run(self, statement: t.Statement, run: Callable[[str], Any]) -> Any:
+        shape = shape_hash(statement)
+        if self.max_violations is not None and self.violations[shape] >= self.max_violations:
+            self.rejected[shape] += 1
+            raise BudgetExceeded(f"Shape {shape} exceeded its budget {self.violations[shape]} times", shape)
+
+        sql = Statement.to_sql_root(self.utils, statement)
+        self._steps = 0
+        self._exceeded = False
+        if self.max_seconds is not None:
+            self._deadline = time.perf_counter() + self.max_seconds
+        self.db.set_progress_handler(self._progress, self.check_every)
+        try:
+            return run(sql)
+        except sqlite3.OperationalError as e:
+            if not self._exceeded:
+                raise
+            self.violations[shape] += 1
+            raise BudgetExceeded(f"Statement aborted after {self._steps} steps: {sql[:200]}", shape) from e
+        finally:
+            self.db.set_progress_handler(None, self.check_every)
+
+    def fetch(self, statement: t.SelectStatement) -> List[Any]:
+        # The rows are produced while fetching, so they run under the budget too
+        return self._run(statement, lambda sql: self.db.execute(sql).fetchall())
+
+    def execute(self, statement: t.Statement) -> int:
+        "Run a write statement, return the number of affected rows."
+        return self._run(statement, lambda sql: self.db.execute(sql).rowcount)
@@ -0,0 +1,58 @@
+import unittest
+
+import dict2sql.types as t
+from dict2sql.execution.budget import BudgetExceeded, QueryBudget
+from dict2sql.fingerprint import shape_hash
+from dict2sql.test_fixtures.utils import open_sqlite_in_memory
+
+
+def _lines_of_tracks_over(milliseconds: int) -> t.SelectStatement:
+    # Nested loop over InvoiceLine x Track (~7.8M rows) that no index helps
+    return {
+        "Select": [{"Aggregate": "COUNT", "Expression": "*"}],
+        "From": {
+            "Join": "INNER JOIN",
+            "Sx": "InvoiceLine",
+            "Dx": "Track",
+            "On": {"Op": "<", "Sx": "InvoiceLine.UnitPrice", "Dx": "Track.Milliseconds"},
+        },
+        "Where": {"Op": ">", "Sx": "Track.Milliseconds", "Dx": str(milliseconds)},
+    }
+
+
+_CHEAP: t.SelectStatement = {"Select": "Name", "From": "Artist", "Limit": 3}
+
+
+class TestQueryBudget(unittest.TestCase):
+    def setUp(self):
+        self.db = open_sqlite_in_memory()
+
+    def test_within_budget(self):
+        budget = QueryBudget(self.db, max_steps=100000)
+        self.assertEqual(len(budget.fetch(_CHEAP)), 3)
+        self.assertEqual(budget.execute({"Delete": {"Table": "Genre"}, "Where": "GenreId = 25"}), 1)
+        self.assertFalse(budget.violations)
+
+    def test_steps(self):
+        budget = QueryBudget(self.db, max_steps=100000)
+        with self.assertRaises(BudgetExceeded) as cm:
+            budget.fetch(_lines_of_tracks_over(1000))
+        self.assertEqual(cm.exception.shape, shape_hash(_lines_of_tracks_over(1000)))
+        # The connection is usable afterwards, and without a handler
+        self.assertEqual(len(self.db.execute("SELECT * FROM Genre").fetchall()), 25)
+
+    def test_seconds(self):
+        budget = QueryBudget(self.db, max_seconds=0.01)
+        with self.assertRaises(BudgetExceeded):
+            budget.fetch(_lines_of_tracks_over(0))
+
+    def test_fail_fast(self):
+        budget = QueryBudget(self.db, max_steps=100000, max_violations=2)
+        for milliseconds in (1000, 2000, 3000):
+            with self.assertRaises(BudgetExceeded):
+                budget.fetch(_lines_of_tracks_over(milliseconds))
+        shape = shape_hash(_lines_of_tracks_over(0))
+        self.assertEqual(budget.violations[shape], 2)
+        self.assertEqual(budget.rejected[shape], 1)
+        # Other shapes still run
+        self.assertEqual(len(budget.fetch(_CHEAP)), 3)
@@ -0,0 +1,239 @@
+"""
+Fetch the result of a Select as columns instead of rows.
+
+fetch_columns() reads the rows chunk_size at a time and appends every
+column of the chunk to its own typed buffer: a NumPy array when NumPy is
+installed, an array.array otherwise. Only one chunk of row tuples is alive
+at any time, and numbers are stored unboxed, which saves most of the memory
+of fetchall() and of the transpose that usually follows it.
+
+Each buffer starts with the type inferred from the declared type of its
+column, following SQLite's affinity rules: INTEGER columns become int64,
+REAL and NUMERIC columns float64, anything else a list (NumPy: an object
+array). Declared types are taken from a schema Catalog when one is given;
+otherwise, as for computed columns, buffers start as int64 and adapt. A
+float turns an int64 buffer into float64 when every integer of the column
+converts to float64 exactly. A NULL, a value that is not a number, or an
+integer that float64 cannot represent turns a buffer into a list of the
+values, with None for NULL. The type a column ends up with only depends on
+its values, not on how they are split in chunks.
+"""
+import array
+import importlib
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import dict2sql.types as t
+from dict2sql.dialects.ansi.statement import Statement
+from dict2sql.dialects.sqlite.utils import Utils
+from dict2sql.schema import Catalog
+from dict2sql.walker import iter_scopes, parse_column_reference
+
+# Imported by name, NumPy is an optional dependency without type stubs here
+try:
+    numpy: Any = importlib.import_module("numpy")
+except ImportError:
+    numpy = None
+
+INT64 = "q"
+FLOAT64 = "d"
+# Typecode of the columns stored as Python objects
+OBJECT: Optional[str] = None
+
+_NUMPY_DTYPES = {INT64: "int64", FLOAT64: "float64"}
+# Kinds of the NumPy arrays a chunk may be converted to, per dtype.
+# Assigning floats to an int64 array would silently truncate them.
+_NUMPY_KINDS = {"int64": "bi", "float64": "bif"}
+# Integers up to this magnitude are exactly represented by a float64
+_MAX_EXACT_INT = 2**53
+
+
+def _exact_as_float(values: Sequence[Any]) -> bool:
+    "Whether every value is a float, or an int that converts to float64 exactly."
+    return all(type(v) is float or (type(v) is int and -_MAX_EXACT_INT <= v <= _MAX_EXACT_INT) for v in values)
+
+
+def typecode_for(declared: str) -> Optional[str]:
+    "Buffer typecode for a column of the given declared type."
+    declared = declared.upper()
+    if "INT" in declared:
+        return INT64
+    if not declared or any(text in declared for text in ("CHAR", "CLOB", "TEXT", "BLOB")):
+        return OBJECT
+    # REAL affinity, and NUMERIC for everything else
+    return FLOAT64
+
+
+class _ColumnBuffer:
+    def __init__(self, typecode: Optional[str], use_numpy: bool, capacity: int):
+        self.use_numpy = use_numpy
+        self.capacity = capacity
+        self.size = 0
+        self.typecode = typecode
+        self._objects: List[Any] = []
+        self._array: Any = self._empty(typecode, capacity)
+
+    def _empty(self, typecode: Optional[str], capacity: int) -> Any:
+        if typecode is OBJECT:
+            return None
+        # OBJECT is None, which the type checker cannot tell from the test above
+        assert typecode is not None
+        if self.use_numpy:
+            return numpy.empty(capacity, dtype=_NUMPY_DTYPES[typecode])
+        return array.array(typecode)
+
+    def _extend_typed(self, values: Sequence[Any]):
+        if not self.use_numpy:
+            try:
+                self._array.extend(values)
+            except (TypeError, OverflowError):
+                # Drop the values appended before the one that did not fit
+                del self._array[self.size :]
+                raise
+            self.size = len(self._array)
+            return
+        chunk = numpy.asarray(values)
+        dtype = self._array.dtype
+        if chunk.dtype.kind not in _NUMPY_KINDS[dtype.name]:
+            raise TypeError(f"Cannot store {chunk.dtype} values as {dtype}")
+        end = self.size + len(values)
+        if end > self.capacity:
+            while self.capacity < end:
+                self.capacity *= 2
+            grown = numpy.empty(self.capacity, dtype=self._array.dtype)
+            grown[: self.size] = self._array[: self.size]
+            self._array = grown
+        self._array[self.size : end] = chunk
+        self.size = end
+
+    def _stored_exact_as_float(self) -> bool:
+        "Whether the integers stored so far convert to float64 exactly."
+        if not self.size:
+            return True
+        stored = self._array[: self.size]
+        if self.use_numpy:
+            low, high = stored.min(), stored.max()
+        else:
+            low, high = min(stored), max(stored)
+        return -_MAX_EXACT_INT <= low and high <= _MAX_EXACT_INT
+
+    def _retype(self, typecode: Optional[str]):
+        if typecode is OBJECT:
+            self._objects = self._array[: self.size].tolist()
+            self._array = None
+        else:
+            retyped = self._empty(typecode, self.capacity)
+            if self.use_numpy:
+                retyped[: self.size] = self._array[: self.size]
+            else:
+                retyped.fromlist(self._array.tolist())
+            self._array = retyped
+        self.typecode = typecode
+
+    def extend(self, values: Sequence[Any]):
+        # Checked before converting, float64 would silently round the values
+        if self.typecode == FLOAT64 and not _exact_as_float(values):
+            self._retype(OBJECT)
+        if self.typecode is OBJECT:
+            self._objects.extend(values)
+            return
+        try:
+            self._extend_typed(values)
+        except (TypeError, ValueError, OverflowError):
+            if _exact_as_float(values) and self._stored_exact_as_float():
+                self._retype(FLOAT64)
+                self._extend_typed(values)
+            else:
+                self._retype(OBJECT)
+                self._objects.extend(values)
+
+    def result(self) -> Any:
+        if self.typecode is not OBJECT:
+            if self.use_numpy:
+                # Give back the unused capacity
+                self._array.resize(self.size, refcheck=False)
+            return self._array
+        if self.use_numpy:
+            objects = numpy.empty(len(self._objects), dtype=object)
+            objects[:] = self._objects
+            return objects
+        return self._objects
+
+
+def _declared_types(statement: t.SelectStatement, catalog: Catalog, count: int) -> List[Optional[str]]:
+    "Declared types of the count result columns of statement, None where unknown."
+    scope = next(iter_scopes(statement))
+    # Lowercase column name -> declared type, per table
+    types = {table.lower(): {k.lower(): v for k, v in catalog.column_types(table).items()} for table in scope.tables}
+    aliases = {alias.lower(): table.lower() for alias, table in scope.aliases.items()}
+
+    def column_type(literal: Any) -> Optional[str]:
+        ref = parse_column_reference(literal)
+        if ref is None:
+            return None
+        if ref.table is not None:
+            table = ref.table.lower()
+            return types.get(aliases.get(table, table), {}).get(ref.column.lower())
+        for table_types in types.values():
+            if ref.column.lower() in table_types:
+                return table_types[ref.column.lower()]
+        return None
+
+    select = statement.get("Select", [])
+    items = select if isinstance(select, list) else [select]
+    declared: List[Optional[str]]
+    if items == ["*"]:
+        declared = [v for table in scope.tables for v in catalog.column_types(table).values()]
+    else:
+        declared = []
+        for item in items:
+            if isinstance(item, str):
+                declared.append(column_type(item))
+            elif item["Aggregate"] == "COUNT":
+                declared.append("INTEGER")
+            elif item["Aggregate"] == "AVG":
+                declared.append("REAL")
+            else:
+                declared.append(column_type(item["Expression"]))
+    return declared if len(declared) == count else [None] * count
+
+
+def fetch_columns(
+    db: sqlite3.Connection,
+    statement: t.SelectStatement,
+    catalog: Optional[Catalog] = None,
+    utils: Optional[Utils] = None,
+    chunk_size: int = 256,
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Run statement and return its result as an ordered mapping from column
+    name to column. use_numpy defaults to whether NumPy is installed.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ValueError("use_numpy requires NumPy, which is not installed")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    cursor = db.execute(Statement.to_sql_root(utils or Utils(), statement))
+    names = [description[0] for description in cursor.description]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate column names in the result: {', '.join(names)}")
+
+    if catalog is not None:
+        declared = _declared_types(statement, catalog, len(names))
+    else:
+        declared = [None] * len(names)
+    buffers = [_ColumnBuffer(INT64 if d is None else typecode_for(d), use_numpy, chunk_size) for d in declared]
+
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for buffer, values in zip(buffers, zip(*rows)):
+            buffer.extend(values)
+
+    return OrderedDict((name, buffer.result()) for name, buffer in zip(names, buffers))
@@ -0,0 +1,136 @@
+import array
+import timeit
+import tracemalloc
+import unittest
+
+import dict2sql
+import dict2sql.types as t
+from dict2sql.execution.columnar import (
+    FLOAT64,
+    INT64,
+    fetch_columns,
+    numpy,
+    typecode_for,
+)
+from dict2sql.schema import Catalog
+from dict2sql.test_fixtures.utils import open_sqlite_in_memory
+
+_TRACKS: t.SelectStatement = {"Select": "*", "From": "Track"}
+_INVOICE_LINES: t.SelectStatement = {
+    "Select": ["il.InvoiceLineId", "TrackId", "UnitPrice", "Quantity"],
+    "From": {"Table": "InvoiceLine", "Alias": "il"},
+}
+
+
+class TestFetchColumns(unittest.TestCase):
+    def setUp(self):
+        self.db = open_sqlite_in_memory()
+        self.catalog = Catalog(self.db)
+
+    def _rows(self, statement: t.SelectStatement):
+        return self.db.execute(dict2sql.dict2sql().to_sql(statement)).fetchall()
+
+    def _assert_same(self, columns, rows):
+        self.assertEqual([list(c) for c in columns.values()], [list(c) for c in zip(*rows)])
+
+    def test_typecode_for(self):
+        self.assertEqual(typecode_for("INTEGER"), INT64)
+        self.assertEqual(typecode_for("NUMERIC(10,2)"), FLOAT64)
+        self.assertEqual(typecode_for("double precision"), FLOAT64)
+        self.assertIsNone(typecode_for("NVARCHAR(200)"))
+        self.assertIsNone(typecode_for(""))
+
+    def test_declared_types(self):
+        columns = fetch_columns(self.db, _TRACKS, self.catalog, chunk_size=500, use_numpy=False)
+        self.assertEqual(
+            list(columns),
+            ["TrackId", "Name", "AlbumId", "MediaTypeId", "GenreId", "Composer", "Milliseconds", "Bytes", "UnitPrice"],
+        )
+        self.assertEqual(columns["TrackId"].typecode, INT64)
+        self.assertEqual(columns["UnitPrice"].typecode, FLOAT64)
+        self.assertIsInstance(columns["Composer"], list)
+        self._assert_same(columns, self._rows(_TRACKS))
+
+        columns = fetch_columns(self.db, _INVOICE_LINES, self.catalog, use_numpy=False)
+        self.assertEqual([c.typecode for c in columns.values()], [INT64, INT64, FLOAT64, INT64])
+        self._assert_same(columns, self._rows(_INVOICE_LINES))
+
+    def test_inferred_types(self):
+        # Without a catalog every column starts as int64 and adapts to its values
+        columns = fetch_columns(self.db, _TRACKS, chunk_size=100, use_numpy=False)
+        self.assertEqual(columns["Milliseconds"].typecode, INT64)
+        self.assertEqual(columns["UnitPrice"].typecode, FLOAT64)
+        self.assertIsInstance(columns["Name"], list)
+        self._assert_same(columns, self._rows(_TRACKS))
+
+    def test_nulls(self):
+        self.db.execute("CREATE TABLE Sample (Id INTEGER, Value INTEGER)")
+        self.db.executemany("INSERT INTO Sample VALUES (?, ?)", [(1, 10), (2, None), (3, 2**62)])
+        statement: t.SelectStatement = {"Select": ["Id", "Value"], "From": "Sample"}
+        for chunk_size in (1, 10):
+            columns = fetch_columns(self.db, statement, self.catalog, chunk_size=chunk_size, use_numpy=False)
+            self.assertEqual(columns["Id"].typecode, INT64)
+            self.assertEqual(columns["Value"], [10, None, 2**62])
+
+    def test_chunk_boundaries(self):
+        # Untyped columns, whose values decide the type of the buffer
+        self.db.execute("CREATE TABLE Sample (Mixed, Big, Prices)")
+        rows = [(1.5, 2**62, 1), (None, 1, 2.5), ("x", 2.5, 3)]
+        self.db.executemany("INSERT INTO Sample VALUES (?, ?, ?)", rows)
+        statement: t.SelectStatement = {"Select": ["Mixed", "Big", "Prices"], "From": "Sample"}
+        for chunk_size in (1, 2, 10):
+            columns = fetch_columns(self.db, statement, chunk_size=chunk_size, use_numpy=False)
+            self.assertEqual(columns["Mixed"], [1.5, None, "x"])
+            self.assertEqual(columns["Big"], [2**62, 1, 2.5])
+            self.assertEqual(columns["Prices"].typecode, FLOAT64)
+            self.assertEqual(list(columns["Prices"]), [1.0, 2.5, 3.0])
+
+    def test_duplicate_names(self):
+        statement: t.SelectStatement = {"Select": ["Track.Name", "Genre.Name"], "From": ["Track", "Genre"]}
+        with self.assertRaises(ValueError):
+            fetch_columns(self.db, statement)
+
+    def test_peak_memory(self):
+        sql = dict2sql.dict2sql().to_sql(_INVOICE_LINES)
+        # Load the schema outside of the measurement
+        self.catalog.refresh()
+        # One tracing session per measurement, the peak is reset by stop()
+        tracemalloc.start()
+        try:
+            rows = self.db.execute(sql).fetchall()
+            tuples_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        del rows
+        tracemalloc.start()
+        try:
+            columns = fetch_columns(self.db, _INVOICE_LINES, self.catalog)
+            columnar_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(columns["TrackId"]), 2240)
+        self.assertLess(columnar_peak, tuples_peak)
+
+    def test_time(self):
+        # Compared with fetchall() and a transpose, timed in the same run.
+        # fetch_columns() takes about 1.3 times as long: the bound is loose
+        # enough for a busy machine, and still fails on a much slower path.
+        sql = dict2sql.dict2sql().to_sql(_INVOICE_LINES)
+        self.catalog.refresh()
+        transposed = min(timeit.repeat(lambda: list(zip(*self.db.execute(sql).fetchall())), number=5, repeat=5))
+        columnar = min(timeit.repeat(lambda: fetch_columns(self.db, _INVOICE_LINES, self.catalog), number=5, repeat=5))
+        self.assertLess(columnar, 3 * transposed)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        columns = fetch_columns(self.db, _TRACKS, self.catalog, chunk_size=500, use_numpy=True)
+        self.assertEqual(columns["TrackId"].dtype, numpy.int64)
+        self.assertEqual(columns["UnitPrice"].dtype, numpy.float64)
+        self.assertEqual(columns["Name"].dtype, object)
+        self._assert_same(columns, self._rows(_TRACKS))
+
+    @unittest.skipIf(numpy is not None, "NumPy is installed")
+    def test_without_numpy(self):
+        self.assertIsInstance(fetch_columns(self.db, _INVOICE_LINES)["TrackId"], array.array)
+        with self.assertRaises(ValueError):
+            fetch_columns(self.db, _INVOICE_LINES, use_numpy=True)
@@ -0,0 +1,277 @@
+"""
+Recommend indexes from a recorded workload of statements.
+
+The advisor counts how often each column is compared for equality, compared
+by range or used in a join condition, derives candidate CREATE INDEX
+statements from those counts and validates each candidate on a scratch copy
+of the database by comparing EXPLAIN QUERY PLAN output and timed execution.
+"""
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import dict2sql.types as t
+from dict2sql.dialects.ansi.statement import Statement
+from dict2sql.dialects.sqlite.utils import Utils
+from dict2sql.walker import (
+    EQUALITY_OPS,
+    RANGE_OPS,
+    ColumnReference,
+    Scope,
+    iter_scopes,
+    parse_column_reference,
+)
+
+TableColumn = Tuple[t.Identifier, t.Identifier]
+
+
+class ColumnUsage(NamedTuple):
+    equality: int
+    range: int
+    join: int
+
+
+class IndexCandidate(NamedTuple):
+    table: t.Identifier
+    columns: Tuple[t.Identifier, ...]
+    # Indices (into the recorded workload) of the statements that motivated the candidate
+    statements: Tuple[int, ...]
+
+
+class IndexRecommendation(NamedTuple):
+    candidate: IndexCandidate
+    sql: str
+    plans_before: List[List[str]]
+    plans_after: List[List[str]]
+    seconds_before: float
+    seconds_after: float
+
+    @property
+    def speedup(self) -> float:
+        if not self.seconds_after:
+            return float("inf")
+        return self.seconds_before / self.seconds_after
+
+    @property
+    def plan_changed(self) -> bool:
+        return self.plans_before != self.plans_after
+
+
+class IndexAdvisor:
+    """
+    Collects a workload with record() and produces a ranked list of
+    IndexRecommendation with recommend().
+
+    The database passed in is never modified: every measurement happens on an
+    in-memory copy of it.
+    """
+
+    def __init__(self, db: sqlite3.Connection, utils: Optional[Utils] = None, repeat: int = 5):
+        self.db = db
+        self.utils = utils or Utils()
+        self.repeat = repeat
+        self.workload: List[t.Statement] = []
+        self._columns: Dict[t.Identifier, List[t.Identifier]] = {}
+
+    def record(self, statement: t.Statement):
+        self.workload.append(statement)
+
+    def record_many(self, statements: Iterable[t.Statement]):
+        for statement in statements:
+            self.record(statement)
+
+    def _table_columns(self, table: t.Identifier) -> List[t.Identifier]:
+        if table not in self._columns:
+            rows = self.db.execute(f"PRAGMA table_info({self.utils.format_identifier(table)})")
+            self._columns[table] = [row[1] for row in rows]
+        return self._columns[table]
+
+    def _covered(self, candidate: "IndexCandidate") -> bool:
+        "Whether an existing index (or the rowid) already starts with the candidate columns."
+        table = self.utils.format_identifier(candidate.table)
+        prefixes = [
+            tuple(row[1] for row in self.db.execute(f"PRAGMA table_info({table})") if row[5] and row[2] == "INTEGER")
+        ]
+        for index in self.db.execute(f"PRAGMA index_list({table})").fetchall():
+            info = self.db.execute(f"PRAGMA index_info({self.utils.format_identifier(index[1])})")
+            prefixes.append(tuple(row[2] for row in sorted(info)))
+        n = len(candidate.columns)
+        return any(prefix[:n] == candidate.columns for prefix in prefixes)
+
+    def _resolve(self, ref: ColumnReference, scope: Scope) -> Optional[TableColumn]:
+        "Attribute a column reference to one of the base tables in scope."
+        tables = scope.tables
+        if ref.table is not None:
+            table = scope.aliases.get(ref.table, ref.table)
+            if table in tables and ref.column in self._table_columns(table):
+                return (table, ref.column)
+            # Qualified by a subquery alias, or by something we do not know about
+            return None
+        owners = [table for table in tables if ref.column in self._table_columns(table)]
+        if len(owners) == 1:
+            return (owners[0], ref.column)
+        return None
+
+    def _statement_usage(self, statement: t.Statement) -> List[Tuple[TableColumn, str]]:
+        "List (column, kind) pairs, where kind is one of equality, range, join."
+        usage: List[Tuple[TableColumn, str]] = []
+        for scope in iter_scopes(statement):
+            for predicate in scope.predicates:
+                sx = parse_column_reference(predicate.sx)
+                dx = parse_column_reference(predicate.dx)
+                sx_col = self._resolve(sx, scope) if sx else None
+                dx_col = self._resolve(dx, scope) if dx else None
+
+                if sx_col and dx_col:
+                    if predicate.op in EQUALITY_OPS:
+                        usage.extend([(sx_col, "join"), (dx_col, "join")])
+                    continue
+
+                column = sx_col or dx_col
+                if column is None:
+                    continue
+                if sx and dx:
+                    # The other side belongs to an outer query (correlated subquery) or to a derived table
+                    if predicate.op in EQUALITY_OPS:
+                        usage.append((column, "join"))
+                    continue
+                if predicate.op in EQUALITY_OPS:
+                    usage.append((column, "equality"))
+                elif predicate.op in RANGE_OPS:
+                    usage.append((column, "range"))
+        return usage
+
+    def usage(self) -> Dict[TableColumn, ColumnUsage]:
+        "Per-column predicate counts over the recorded workload."
+        counts: Counter = Counter()
+        for statement in self.workload:
+            counts.update(self._statement_usage(statement))
+        columns = sorted({column for column, _ in counts})
+        return {
+            column: ColumnUsage(
+                counts[(column, "equality")],
+                counts[(column, "range")],
+                counts[(column, "join")],
+            )
+            for column in columns
+        }
+
+    def candidates(self) -> List[IndexCandidate]:
+        """
+        For every statement and table build one composite candidate: the
+        equality columns (most used first) followed by at most one range column.
+        Join columns get a single-column candidate each. Candidates already
+        served by an existing index are left out.
+        """
+        usage = self.usage()
+        found: "OrderedDict[Tuple[t.Identifier, Tuple[t.Identifier, ...]], List[int]]" = OrderedDict()
+
+        def add(table: t.Identifier, columns: Tuple[t.Identifier, ...], idx: int):
+            statements = found.setdefault((table, columns), [])
+            if idx not in statements:
+                statements.append(idx)
+
+        def popularity(column: TableColumn):
+            u = usage[column]
+            return (-(u.equality + u.join), column[1])
+
+        for idx, statement in enumerate(self.workload):
+            per_table: Dict[t.Identifier, Dict[str, List[TableColumn]]] = {}
+            for column, kind in self._statement_usage(statement):
+                if kind == "join":
+                    add(column[0], (column[1],), idx)
+                    continue
+                kinds = per_table.setdefault(column[0], {"equality": [], "range": []})
+                if column not in kinds[kind]:
+                    kinds[kind].append(column)
+
+            for table, kinds in per_table.items():
+                equality = sorted(kinds["equality"], key=popularity)
+                ranges = sorted((c for c in kinds["range"] if c not in equality), key=popularity)
+                columns = tuple(c[1] for c in equality + ranges[:1])
+                add(table, columns, idx)
+
+        candidates = [IndexCandidate(table, columns, tuple(stmts)) for (table, columns), stmts in found.items()]
+        return [candidate for candidate in candidates if not self._covered(candidate)]
+
+    def _index_name(self, candidate: IndexCandidate) -> str:
+        return self.utils.format_identifier("_".join(["idx", candidate.table] + list(candidate.columns)))
+
+    def _index_sql(self, candidate: IndexCandidate) -> str:
+        columns = ", ".join(self.utils.format_identifier(c) for c in candidate.columns)
+        return (
+            f"CREATE INDEX {self._index_name(candidate)} "
+            f"ON {self.utils.format_identifier(candidate.table)} ({columns})"
+        )
+
+    def _scratch_copy(self) -> sqlite3.Connection:
+        scratch = sqlite3.connect(":memory:")
+        self.db.backup(scratch)
+        # Manage transactions explicitly, so that writes can be rolled back after measuring them
+        scratch.isolation_level = None
+        return scratch
+
+    @staticmethod
+    def _plan(db: sqlite3.Connection, sql: str) -> List[str]:
+        return [row[3] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+    def _time(self, db: sqlite3.Connection, sql: str) -> float:
+        best = float("inf")
+        for _ in range(self.repeat):
+            db.execute("SAVEPOINT dict2sql_index_advisor")
+            start = time.perf_counter()
+            db.execute(sql).fetchall()
+            best = min(best, time.perf_counter() - start)
+            db.execute("ROLLBACK TO dict2sql_index_advisor")
+            db.execute("RELEASE dict2sql_index_advisor")
+        return best
+
+    def _measure(self, db: sqlite3.Connection, sqls: List[str]) -> Tuple[List[List[str]], float]:
+        return [self._plan(db, sql) for sql in sqls], sum(self._time(db, sql) for sql in sqls)
+
+    def recommend(self, min_speedup: float = 1.0) -> List[IndexRecommendation]:
+        """
+        Validate every candidate and return those whose measured speedup over
+        the statements that motivated them is above min_speedup, best first.
+        """
+        scratch = self._scratch_copy()
+        try:
+            sqls = [Statement.to_sql_root(self.utils, statement) for statement in self.workload]
+            baseline = {idx: self._measure(scratch, [sql]) for idx, sql in enumerate(sqls)}
+
+            recommendations: List[IndexRecommendation] = []
+            for candidate in self.candidates():
+                index_sql = self._index_sql(candidate)
+                scratch.execute(index_sql)
+                try:
+                    plans_after, seconds_after = self._measure(scratch, [sqls[i] for i in candidate.statements])
+                finally:
+                    scratch.execute(f"DROP INDEX {self._index_name(candidate)}")
+
+                recommendation = IndexRecommendation(
+                    candidate,
+                    index_sql,
+                    [baseline[i][0][0] for i in candidate.statements],
+                    plans_after,
+                    sum(baseline[i][1] for i in candidate.statements),
+                    seconds_after,
+                )
+                if recommendation.plan_changed and recommendation.speedup > min_speedup:
+                    recommendations.append(recommendation)
+        finally:
+            scratch.close()
+
+        return sorted(recommendations, key=lambda r: r.speedup, reverse=True)
+
+    @staticmethod
+    def report(recommendations: List[IndexRecommendation]) -> str:
+        "Human-readable summary of recommend()."
+        lines = []
+        for rank, r in enumerate(recommendations, 1):
+            lines.append(
+                f"{rank}. {r.sql}  -- {r.speedup:.1f}x "
+                f"({r.seconds_before * 1000:.3f}ms -> {r.seconds_after * 1000:.3f}ms "
+                f"over {len(r.candidate.statements)} statement(s))"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,95 @@
+import unittest
+
+import dict2sql.types as t
+from dict2sql.execution.index_advisor import ColumnUsage, IndexAdvisor
+from dict2sql.test_fixtures.utils import open_sqlite_in_memory
+
+
+def _customers_in(country: str) -> t.SelectStatement:
+    return {
+        "Select": ["FirstName", "LastName"],
+        "From": "Customer",
+        "Where": {
+            "Op": "AND",
+            "Predicates": [
+                {"Op": "=", "Sx": "Country", "Dx": {"Type": "Quoted", "Expression": country}},
+                {"Op": ">", "Sx": "SupportRepId", "Dx": "2"},
+            ],
+        },
+    }
+
+
+_INVOICE_LINES_FOR_TRACK: t.SelectStatement = {
+    "Select": ["InvoiceLine.Quantity", "Track.Name"],
+    "From": {
+        "Join": "INNER JOIN",
+        "Sx": "InvoiceLine",
+        "Dx": "Track",
+        "On": {"Op": "=", "Sx": "InvoiceLine.TrackId", "Dx": "Track.TrackId"},
+    },
+    "Where": {"Op": "=", "Sx": "Track.Composer", "Dx": {"Type": "Quoted", "Expression": "AC/DC"}},
+}
+
+
+class TestIndexAdvisor(unittest.TestCase):
+    def setUp(self):
+        self.db = open_sqlite_in_memory()
+        self.advisor = IndexAdvisor(self.db, repeat=2)
+
+    def test_usage(self):
+        self.advisor.record_many([_customers_in("Canada"), _customers_in("Brazil"), _INVOICE_LINES_FOR_TRACK])
+        usage = self.advisor.usage()
+        self.assertEqual(usage[("Customer", "Country")], ColumnUsage(2, 0, 0))
+        self.assertEqual(usage[("Customer", "SupportRepId")], ColumnUsage(0, 2, 0))
+        self.assertEqual(usage[("Track", "Composer")], ColumnUsage(1, 0, 0))
+        self.assertEqual(usage[("InvoiceLine", "TrackId")], ColumnUsage(0, 0, 1))
+
+    def test_candidates(self):
+        self.advisor.record_many([_customers_in("Canada"), _customers_in("Brazil"), _INVOICE_LINES_FOR_TRACK])
+        candidates = {(c.table, c.columns): c.statements for c in self.advisor.candidates()}
+        self.assertEqual(candidates[("Customer", ("Country", "SupportRepId"))], (0, 1))
+        self.assertEqual(candidates[("Track", ("Composer",))], (2,))
+        # Already indexed in the fixture
+        self.assertNotIn(("InvoiceLine", ("TrackId",)), candidates)
+
+    def test_recommend(self):
+        self.advisor.record_many([_customers_in("Canada"), _INVOICE_LINES_FOR_TRACK])
+        recommendations = self.advisor.recommend(min_speedup=0)
+        indexed = {(r.candidate.table, r.candidate.columns) for r in recommendations}
+
+        self.assertIn(("Customer", ("Country", "SupportRepId")), indexed)
+        for r in recommendations:
+            self.assertTrue(any("INDEX" in line for plan in r.plans_after for line in plan))
+        self.assertEqual(
+            [r.speedup for r in recommendations], sorted((r.speedup for r in recommendations), reverse=True)
+        )
+        self.assertIn("CREATE INDEX", IndexAdvisor.report(recommendations))
+
+        # The original database is left untouched
+        names = [row[0] for row in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        self.assertFalse(any(name.startswith("idx_") for name in names))
+
+    def test_usage_subqueries(self):
+        self.advisor.record(
+            {
+                "Select": "FirstName",
+                "From": "Customer",
+                "Where": {
+                    "Op": "AND",
+                    "Predicates": [
+                        {
+                            "Op": "EXISTS",
+                            "Query": {
+                                "Select": "1",
+                                "From": "Invoice",
+                                "Where": {"Op": "=", "Sx": "Invoice.CustomerId", "Dx": "Customer.CustomerId"},
+                            },
+                        },
+                        {"Op": "IN", "Sx": "SupportRepId", "Query": {"Select": "EmployeeId", "From": "Employee"}},
+                    ],
+                },
+            }
+        )
+        usage = self.advisor.usage()
+        self.assertEqual(usage[("Invoice", "CustomerId")], ColumnUsage(0, 0, 1))
+        self.assertEqual(usage[("Customer", "SupportRepId")], ColumnUsage(1, 0, 0))
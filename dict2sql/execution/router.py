@@ -0,0 +1,209 @@
+"""
+Route statements across SQLite databases sharded by a key column.
+
+A statement whose Where clause pins the key column to literal values (with
+=, or through AND/OR combinations of such comparisons) runs only on the
+shards owning those values. An Insert is routed by the key in its Data, and
+the rows of a multi-row Insert are split by shard. Every other statement
+fans out to all shards in a thread pool. An Update setting the key column
+raises ValueError, since its rows would have to move to another shard.
+
+Rows from several shards are concatenated in shard order and the Limit of
+the statement is applied again to the merged result. Aggregates (as
+Aggregate clauses or as raw calls like "COUNT(*)" in Select), GroupBy and
+Having cannot be merged this way, so fanning them out raises ValueError.
+
+Writes are not atomic across shards: execute_many commits the statements
+of each shard in that shard's own transaction, so when one shard fails the
+others may already be committed. Since only the affected rows are counted,
+statements with a Returning clause raise ValueError.
+"""
+import re
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import dict2sql.types as t
+from dict2sql.dialects.ansi.statement import Statement
+from dict2sql.dialects.sqlite.utils import Utils
+from dict2sql.walker import parse_column_reference
+
+# A call to an aggregate function in raw SQL text
+_AGGREGATE_CALL_RE = re.compile(r"\b(COUNT|SUM|AVG|MIN|MAX|TOTAL|GROUP_CONCAT)\s*\(", re.IGNORECASE)
+
+
+class _Shard:
+    def __init__(self, database: str, **connect_kwargs: Any):
+        # The lock serializes the threads of the pool on this connection
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(database, check_same_thread=False, **connect_kwargs)
+
+    def fetch(self, sql: str) -> List[Any]:
+        with self.lock:
+            return self.db.execute(sql).fetchall()
+
+    def execute(self, sqls: List[str]) -> int:
+        "Run sqls in a single transaction, return the number of affected rows."
+        with self.lock, self.db:
+            return sum(self.db.execute(sql).rowcount for sql in sqls)
+
+
+class ShardRouter:
+    """
+    shards maps shard names to database paths; key is the sharding column.
+    shard_for maps a key value, as text, to a shard name; by default it
+    hashes the value with CRC32, which is stable across processes.
+    """
+
+    def __init__(
+        self,
+        shards: Dict[str, str],
+        key: t.Identifier,
+        shard_for: Optional[Callable[[str], str]] = None,
+        utils: Optional[Utils] = None,
+        max_workers: Optional[int] = None,
+        **connect_kwargs: Any,
+    ):
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.key = key
+        self.utils = utils or Utils()
+        self.names = sorted(shards)
+        self.shard_for = shard_for or self._crc32_shard_for
+        self._shards = OrderedDict((name, _Shard(shards[name], **connect_kwargs)) for name in self.names)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or len(shards))
+
+    def _crc32_shard_for(self, value: str) -> str:
+        return self.names[zlib.crc32(value.encode("utf-8")) % len(self.names)]
+
+    def _is_key(self, literal: Any) -> bool:
+        ref = parse_column_reference(literal)
+        return ref is not None and ref.column == self.key
+
+    @staticmethod
+    def _key_value(literal: Any) -> Optional[str]:
+        if t.isExpressionLiteralQuoted(literal):
+            return literal["Expression"]
+        if t.isExpressionLiteralSimple(literal) and parse_column_reference(literal) is None:
+            return literal
+        return None
+
+    def _pinned(self, expression: Any) -> Optional[Set[str]]:
+        "Key values expression restricts the rows to, None if it does not."
+        if not isinstance(expression, dict):
+            return None
+        if t.isExpressionSxDx(expression):
+            if expression["Op"] != "=":
+                return None
+            for column, literal in ((expression["Sx"], expression["Dx"]), (expression["Dx"], expression["Sx"])):
+                value = self._key_value(literal)
+                if self._is_key(column) and value is not None:
+                    return {value}
+            return None
+        if t.isExpressionBoolean(expression):
+            pinned = [self._pinned(p) for p in expression["Predicates"]]
+            known = [p for p in pinned if p is not None]
+            if expression["Op"] == "AND":
+                return set.intersection(*known) if known else None
+            if len(known) < len(pinned):
+                return None
+            return set.union(*known) if known else None
+        return None
+
+    def shards_for(self, statement: t.Statement) -> List[str]:
+        "Names of the shards statement has to run on."
+        values: Optional[Set[str]] = None
+        if "Insert" in statement:
+            values = {self._row_key(row) for row in self._insert_rows(statement)}
+        elif "Update" in statement and any(self._is_key(column) for column in statement["Update"]["Data"]):
+            raise ValueError(f'Update of the "{self.key}" sharding key would move rows across shards')
+        elif "Where" in statement:
+            values = self._pinned(statement["Where"])
+
+        if values is None:
+            return list(self.names)
+        shards = {self.shard_for(value) for value in values}
+        return [name for name in self.names if name in shards]
+
+    @staticmethod
+    def _insert_rows(statement: t.InsertStatement) -> t.ValueMapList:
+        data = statement["Insert"]["Data"]
+        return data if isinstance(data, list) else [data]
+
+    def _row_key(self, row: t.ValueMap) -> str:
+        if self.key not in row:
+            raise ValueError(f'Insert without the "{self.key}" sharding key cannot be routed')
+        return str(row[self.key])
+
+    def _split_insert(self, statement: t.InsertStatement) -> Dict[str, t.InsertStatement]:
+        "Split the rows of a multi-row Insert by shard, keeping its other clauses."
+        rows: Dict[str, t.ValueMapList] = OrderedDict()
+        for row in self._insert_rows(statement):
+            rows.setdefault(self.shard_for(self._row_key(row)), []).append(row)
+        return {name: {**statement, "Insert": {**statement["Insert"], "Data": data}} for name, data in rows.items()}
+
+    @staticmethod
+    def _check_mergeable(statement: t.SelectStatement):
+        select = statement.get("Select", [])
+        items = select if isinstance(select, list) else [select]
+        if "GroupBy" in statement or "Having" in statement:
+            raise ValueError("GroupBy and Having cannot be merged across shards, pin the sharding key")
+        for item in items:
+            if t.isAggregate(item) or (isinstance(item, str) and _AGGREGATE_CALL_RE.search(item)):
+                raise ValueError("Aggregates cannot be merged across shards, pin the sharding key")
+
+    def fetch(self, statement: t.SelectStatement) -> List[Any]:
+        "Run a Select on the shards it needs and merge the results."
+        names = self.shards_for(statement)
+        # Contradicting pins (e.g. key = 'a' AND key = 'b') match no shard
+        if not names:
+            return []
+        sql = Statement.to_sql_root(self.utils, statement)
+        if len(names) == 1:
+            return self._shards[names[0]].fetch(sql)
+
+        self._check_mergeable(statement)
+        results = self._pool.map(lambda name: self._shards[name].fetch(sql), names)
+        rows = [row for result in results for row in result]
+        if "Limit" in statement:
+            rows = rows[: statement["Limit"]]
+        return rows
+
+    def execute(self, statement: t.Statement) -> int:
+        return self.execute_many([statement])
+
+    def execute_many(self, statements: Iterable[t.Statement]) -> int:
+        """
+        Group write statements by shard and run each group in one transaction,
+        shards in parallel. Returns the total number of affected rows.
+        Each shard commits on its own: if one fails, the others may have
+        committed already.
+        """
+        groups: Dict[str, List[str]] = OrderedDict((name, []) for name in self.names)
+        for statement in statements:
+            if "Returning" in statement:
+                raise ValueError("Returning is not supported across shards, execute_many only counts rows")
+            if "Insert" in statement:
+                for name, insert in self._split_insert(statement).items():
+                    groups[name].append(Statement.to_sql_root(self.utils, insert))
+                continue
+            sql = Statement.to_sql_root(self.utils, statement)
+            for name in self.shards_for(statement):
+                groups[name].append(sql)
+
+        pending = [name for name, sqls in groups.items() if sqls]
+        return sum(self._pool.map(lambda name: self._shards[name].execute(groups[name]), pending))
+
+    def close(self):
+        self._pool.shutdown()
+        for shard in self._shards.values():
+            shard.db.close()
+
+    def __enter__(self) -> "ShardRouter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
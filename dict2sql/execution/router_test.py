@@ -0,0 +1,116 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from typing import List
+
+import dict2sql.types as t
+from dict2sql.execution.router import ShardRouter
+from dict2sql.test_fixtures.utils import copy_sqlite_to_disk
+
+
+class TestShardRouter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        source = copy_sqlite_to_disk(self.tmp.name)
+        shards = {}
+        for name in ["a", "b", "c"]:
+            shards[name] = os.path.join(self.tmp.name, f"{name}.sqlite3")
+            shutil.copyfile(source, shards[name])
+        self.router = ShardRouter(shards, "CustomerId")
+
+        # Only keep the customers owned by each shard
+        self.customers = list(sqlite3.connect(source).execute("SELECT CustomerId, FirstName FROM Customer"))
+        for name, path in shards.items():
+            with sqlite3.connect(path) as db:
+                for customer_id, _ in self.customers:
+                    if self.router.shard_for(str(customer_id)) != name:
+                        db.execute("DELETE FROM Customer WHERE CustomerId = ?", (customer_id,))
+
+    def tearDown(self):
+        self.router.close()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def _is_customer(customer_id: int) -> t.ExpressionSxDx:
+        return {"Op": "=", "Sx": "CustomerId", "Dx": str(customer_id)}
+
+    def _customer(self, customer_id: int) -> t.SelectStatement:
+        return {"Select": ["CustomerId", "FirstName"], "From": "Customer", "Where": self._is_customer(customer_id)}
+
+    def test_pinned(self):
+        statement = self._customer(5)
+        self.assertEqual(self.router.shards_for(statement), [self.router.shard_for("5")])
+        self.assertEqual(self.router.fetch(statement), [self.customers[4]])
+
+        both: t.SelectStatement = {
+            "Select": ["CustomerId", "FirstName"],
+            "From": "Customer",
+            "Where": {"Op": "OR", "Predicates": [self._is_customer(5), self._is_customer(6)]},
+        }
+        self.assertEqual(set(self.router.shards_for(both)), {self.router.shard_for("5"), self.router.shard_for("6")})
+        self.assertEqual(sorted(self.router.fetch(both)), self.customers[4:6])
+
+        neither: t.SelectStatement = {
+            "Select": ["CustomerId", "FirstName"],
+            "From": "Customer",
+            "Where": {"Op": "AND", "Predicates": [self._is_customer(5), self._is_customer(6)]},
+        }
+        self.assertEqual(self.router.shards_for(neither), [])
+        self.assertEqual(self.router.fetch(neither), [])
+
+    def test_fan_out(self):
+        statement: t.SelectStatement = {"Select": ["CustomerId", "FirstName"], "From": "Customer"}
+        self.assertEqual(self.router.shards_for(statement), ["a", "b", "c"])
+        self.assertEqual(sorted(self.router.fetch(statement)), self.customers)
+
+        limited: t.SelectStatement = {"Select": ["CustomerId", "FirstName"], "From": "Customer", "Limit": 7}
+        self.assertEqual(len(self.router.fetch(limited)), 7)
+
+        with self.assertRaises(ValueError):
+            self.router.fetch({"Select": {"Aggregate": "COUNT", "Expression": "*"}, "From": "Customer"})
+        with self.assertRaises(ValueError):
+            self.router.fetch({"Select": "count(*)", "From": "Customer"})
+        with self.assertRaises(ValueError):
+            self.router.fetch({"Select": "Country", "From": "Customer", "Having": "Country > 'M'"})
+
+    def test_writes(self):
+        inserts: List[t.InsertStatement] = [
+            {
+                "Insert": {
+                    "Table": "Customer",
+                    "Data": {"CustomerId": str(customer_id), "FirstName": "New", "LastName": "Customer", "Email": "x"},
+                }
+            }
+            for customer_id in range(100, 110)
+        ]
+        self.assertEqual(self.router.execute_many(inserts), 10)
+        multi_row: t.InsertStatement = {
+            "Insert": {
+                "Table": "Customer",
+                "Data": [
+                    {"CustomerId": str(customer_id), "FirstName": "New", "LastName": "Customer", "Email": "x"}
+                    for customer_id in range(110, 120)
+                ],
+            }
+        }
+        self.assertEqual(len(self.router.shards_for(multi_row)), 3)
+        self.assertEqual(self.router.execute(multi_row), 10)
+
+        for customer_id in range(100, 120):
+            self.assertEqual(self.router.fetch(self._customer(customer_id)), [(customer_id, "New")])
+
+        deleted = self.router.execute(
+            {"Delete": {"Table": "Customer"}, "Where": {"Op": ">=", "Sx": "CustomerId", "Dx": "100"}}
+        )
+        self.assertEqual(deleted, 20)
+
+        with self.assertRaises(ValueError):
+            self.router.execute({"Insert": {"Table": "Customer", "Data": {"FirstName": "x"}}})
+        with self.assertRaises(ValueError):
+            self.router.execute({**multi_row, "Returning": ["CustomerId"]})
+        with self.assertRaises(ValueError):
+            self.router.execute(
+                {"Update": {"Table": "Customer", "Data": {"CustomerId": "200"}}, "Where": self._is_customer(5)}
+            )
@@ -0,0 +1,154 @@
+"""
+Canonical forms and digests of statements.
+
+canonicalize() rewrites a statement into a deterministic form without
+changing its meaning: the columns of Insert/Update Data are sorted, the
+predicates of AND/OR are sorted and comparisons keep a column reference on
+their left-hand side (mirroring the operator when they are swapped). The
+order of selected columns, of tables and of join sides is kept, as it is
+visible in the result.
+
+shape() additionally replaces literal values with a "?" placeholder, so that
+statements which differ only in their values share a shape. Only the
+operands of comparisons and the values of Insert/Update Data are replaced:
+raw SQL text used as a whole expression is kept, since its values cannot be
+told apart from the rest of it. Limit is not replaced either, since it
+usually changes the query plan. The digests are
+computed over a compact JSON encoding, hence they are stable across
+processes and Python versions.
+"""
+import hashlib
+import json
+from typing import Any, Dict, NamedTuple, Union
+
+import dict2sql.types as t
+from dict2sql.walker import KEYWORDS, parse_column_reference
+
+PLACEHOLDER = "?"
+
+_MIRRORED_OPS = {"=": "=", "<": ">", ">": "<", "<=": ">=", ">=": "<="}
+
+
+class Fingerprint(NamedTuple):
+    shape: str
+    value: str
+
+
+def _is_value(literal: Any) -> bool:
+    if t.isExpressionLiteralQuoted(literal):
+        return True
+    return (
+        t.isExpressionLiteralSimple(literal)
+        and parse_column_reference(literal) is None
+        and literal.upper() not in KEYWORDS
+    )
+
+
+def _sort_key(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True)
+
+
+def _operand(operand: Any, placeholders: bool) -> Any:
+    "Operand of a comparison: literal values become placeholders."
+    if placeholders and (_is_value(operand) or t.isExpressionLiteralQuoted(operand)):
+        return PLACEHOLDER
+    if t.isScalarSubQuery(operand):
+        return dict(operand, Query=_statement(operand["Query"], placeholders))
+    return operand
+
+
+def _expression(expr: Any, placeholders: bool) -> Any:
+    # Raw SQL text (e.g. a Where of "GenreId = 25") is kept whole: only the
+    # operands of structured comparisons are replaced by placeholders
+    if not isinstance(expr, dict):
+        return expr
+    if t.isExpressionExists(expr):
+        return dict(expr, Query=_statement(expr["Query"], placeholders))
+    if t.isExpressionIn(expr):
+        return dict(expr, Sx=_operand(expr["Sx"], placeholders), Query=_statement(expr["Query"], placeholders))
+    if t.isExpressionBoolean(expr):
+        predicates = sorted((_expression(p, placeholders) for p in expr["Predicates"]), key=_sort_key)
+        return {"Op": expr["Op"], "Predicates": predicates}
+    if t.isExpressionSxDx(expr):
+        op, sx, dx = expr["Op"], expr["Sx"], expr["Dx"]
+        if _is_value(sx) and not _is_value(dx):
+            op, sx, dx = _MIRRORED_OPS[op], dx, sx
+        elif op == "=" and _is_value(sx) == _is_value(dx) and _sort_key(sx) > _sort_key(dx):
+            sx, dx = dx, sx
+        return {"Op": op, "Sx": _operand(sx, placeholders), "Dx": _operand(dx, placeholders)}
+    return expr
+
+
+def _from(clause: Any, placeholders: bool) -> Any:
+    if t.isTableNameList(clause):
+        return [_from(sub, placeholders) for sub in clause]
+    if t.isJoin(clause):
+        return dict(
+            clause,
+            Sx=_from(clause["Sx"], placeholders),
+            Dx=_from(clause["Dx"], placeholders),
+            On=_expression(clause["On"], placeholders),
+        )
+    if t.isSubQuery(clause):
+        return dict(clause, Query=_statement(clause["Query"], placeholders))
+    return clause
+
+
+def _value_map(data: t.ValueMap, placeholders: bool) -> t.ValueMap:
+    return {k: PLACEHOLDER if placeholders else data[k] for k in sorted(data)}
+
+
+def _value_clause(clause: Union[t.ValueClause, t.InsertClause], placeholders: bool) -> Dict[str, Any]:
+    data = clause["Data"]
+    if isinstance(data, list):
+        return dict(clause, Data=[_value_map(row, placeholders) for row in data])
+    return dict(clause, Data=_value_map(data, placeholders))
+
+
+def _common_table_expression(cte: t.CommonTableExpression, placeholders: bool) -> Dict[str, Any]:
+    canonical = dict(cte, Query=_statement(cte["Query"], placeholders))
+    if "Recursive" in cte:
+        canonical["Recursive"] = _statement(cte["Recursive"], placeholders)
+    return canonical
+
+
+def _statement(statement: Any, placeholders: bool) -> Any:
+    canonical = dict(statement)
+    if "With" in canonical:
+        canonical["With"] = [_common_table_expression(cte, placeholders) for cte in canonical["With"]]
+    if "From" in canonical:
+        canonical["From"] = _from(canonical["From"], placeholders)
+    for key in ("Where", "Having"):
+        if key in canonical:
+            canonical[key] = _expression(canonical[key], placeholders)
+    for key in ("Insert", "Update"):
+        if key in canonical:
+            canonical[key] = _value_clause(canonical[key], placeholders)
+    return canonical
+
+
+def canonicalize(statement: t.Statement) -> t.Statement:
+    "Equivalent statement in canonical form. The input is not modified."
+    return _statement(statement, False)
+
+
+def shape(statement: t.Statement) -> t.Statement:
+    "Canonical form of statement with literal values replaced by placeholders."
+    return _statement(statement, True)
+
+
+def _digest(obj: Any) -> str:
+    encoded = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def shape_hash(statement: t.Statement) -> str:
+    return _digest(shape(statement))
+
+
+def value_hash(statement: t.Statement) -> str:
+    return _digest(canonicalize(statement))
+
+
+def fingerprint(statement: t.Statement) -> Fingerprint:
+    return Fingerprint(shape_hash(statement), value_hash(statement))
@@ -0,0 +1,102 @@
+import copy
+import unittest
+from typing import Any
+
+import dict2sql
+import dict2sql.types as t
+from dict2sql.fingerprint import canonicalize, fingerprint, shape
+
+_QUERY: t.SelectStatement = {
+    "Select": ["FirstName", "LastName"],
+    "From": "Customer",
+    "Where": {
+        "Op": "AND",
+        "Predicates": [
+            {"Op": "=", "Sx": "Country", "Dx": {"Type": "Quoted", "Expression": "Canada"}},
+            {"Op": "<", "Sx": "2", "Dx": "SupportRepId"},
+        ],
+    },
+    "Limit": 5,
+}
+
+_REORDERED: t.SelectStatement = {
+    "Limit": 5,
+    "Where": {
+        "Op": "AND",
+        "Predicates": [
+            {"Op": ">", "Sx": "SupportRepId", "Dx": "2"},
+            {"Op": "=", "Sx": "Country", "Dx": {"Type": "Quoted", "Expression": "Canada"}},
+        ],
+    },
+    "From": "Customer",
+    "Select": ["FirstName", "LastName"],
+}
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_canonicalize(self):
+        before = copy.deepcopy(_QUERY)
+        canonical: Any = canonicalize(_QUERY)
+        self.assertEqual(canonical, canonicalize(_REORDERED))
+        self.assertIn({"Op": ">", "Sx": "SupportRepId", "Dx": "2"}, canonical["Where"]["Predicates"])
+        # The input is left untouched
+        self.assertEqual(_QUERY, before)
+
+    def test_canonical_sql(self):
+        compiler = dict2sql.dict2sql()
+        self.assertEqual(compiler.to_sql(canonicalize(_QUERY)), compiler.to_sql(canonicalize(_REORDERED)))
+        insert1: t.InsertStatement = {"Insert": {"Table": "Artist", "Data": {"Name": "x", "ArtistId": "1000"}}}
+        insert2: t.InsertStatement = {"Insert": {"Table": "Artist", "Data": {"ArtistId": "1000", "Name": "x"}}}
+        self.assertEqual(compiler.to_sql(insert1), compiler.to_sql(insert2))
+
+    def test_shape(self):
+        shaped: Any = shape(_QUERY)
+        self.assertEqual(
+            shaped["Where"]["Predicates"],
+            [{"Op": "=", "Sx": "Country", "Dx": "?"}, {"Op": ">", "Sx": "SupportRepId", "Dx": "?"}],
+        )
+        update: t.UpdateStatement = {
+            "Update": {"Table": "Artist", "Data": {"Name": "x"}},
+            "Where": {"Op": "=", "Sx": "ArtistId", "Dx": "NULL"},
+        }
+        self.assertEqual(
+            shape(update),
+            {
+                "Update": {"Table": "Artist", "Data": {"Name": "?"}},
+                "Where": {"Op": "=", "Sx": "ArtistId", "Dx": "NULL"},
+            },
+        )
+
+    def test_shape_raw_expression(self):
+        # Raw SQL text is not a value: different filters keep different shapes
+        first: t.DeleteStatement = {"Delete": {"Table": "Genre"}, "Where": "GenreId = 25"}
+        second: t.DeleteStatement = {"Delete": {"Table": "Genre"}, "Where": "Name = 'Opera'"}
+        self.assertEqual(shape(first), dict(first, Where="GenreId = 25"))
+        self.assertNotEqual(fingerprint(first).shape, fingerprint(second).shape)
+        boolean: t.SelectStatement = {
+            "Select": "Name",
+            "From": "Genre",
+            "Where": {"Op": "AND", "Predicates": ["GenreId > 1", {"Op": "<", "Sx": "GenreId", "Dx": "10"}]},
+        }
+        shaped: Any = shape(boolean)
+        self.assertIn("GenreId > 1", shaped["Where"]["Predicates"])
+
+    def test_digests(self):
+        other_values: t.SelectStatement = {
+            **_QUERY,
+            "Where": {
+                "Op": "AND",
+                "Predicates": [
+                    {"Op": "=", "Sx": "Country", "Dx": {"Type": "Quoted", "Expression": "Italy"}},
+                    {"Op": ">", "Sx": "SupportRepId", "Dx": "7"},
+                ],
+            },
+        }
+        other_shape: t.SelectStatement = {**_QUERY, "Select": ["FirstName"]}
+
+        self.assertEqual(fingerprint(_QUERY), fingerprint(_REORDERED))
+        self.assertEqual(fingerprint(_QUERY).shape, fingerprint(other_values).shape)
+        self.assertNotEqual(fingerprint(_QUERY).value, fingerprint(other_values).value)
+        self.assertNotEqual(fingerprint(_QUERY).shape, fingerprint(other_shape).shape)
+        # Stable across processes and runs
+        self.assertEqual(len(fingerprint(_QUERY).shape), 32)
@@ -0,0 +1,137 @@
+"""
+Compile-time guards against statements that are too expensive to send.
+
+CostGuards rejects a statement before it reaches the database when it has
+more comparison predicates than max_predicates, when its expressions and
+subqueries nest deeper than max_depth, when one of its Selects reads from
+one of the limit_required_on tables without a Limit, or when its compiled
+SQL is longer than max_size characters. Every check is optional.
+
+The Limit must be on the Select that reads the table: the Limit of an
+enclosing query does not bound its subqueries (an IN subquery, say, is
+still evaluated in full).
+
+Predicates are the comparisons, IN and EXISTS of Where, Having and join
+conditions, subqueries included. The depth of a statement is one more than
+the depth of the deepest subquery or AND/OR it contains, so a Select with
+a single comparison has depth 1 and one with an AND of comparisons has
+depth 2.
+"""
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import dict2sql.types as t
+
+
+class GuardError(ValueError):
+    pass
+
+
+# Kinds of the nodes of a statement
+_STATEMENT, _FROM, _EXPRESSION = range(3)
+
+
+def _iter_nodes(statement: t.Statement) -> Iterator[Tuple[int, Any, int]]:
+    """
+    Yield (kind, node, depth) for statement and for the From clauses and
+    expressions nested in it. The walk uses a stack instead of recursion, so
+    that deeply nested statements get rejected rather than overflow it.
+    """
+    # (kind, node, depth of the enclosing node)
+    stack: List[Tuple[int, Any, int]] = [(_STATEMENT, statement, 0)]
+    while stack:
+        kind, node, depth = stack.pop()
+        if kind == _STATEMENT:
+            depth += 1
+            for cte in node.get("With", []):
+                stack.append((_STATEMENT, cte["Query"], depth))
+                if "Recursive" in cte:
+                    stack.append((_STATEMENT, cte["Recursive"], depth))
+            if "From" in node:
+                stack.append((_FROM, node["From"], depth))
+            for key in ("Where", "Having"):
+                if key in node:
+                    stack.append((_EXPRESSION, node[key], depth))
+        elif kind == _FROM:
+            if t.isTableNameList(node):
+                stack.extend((_FROM, sub, depth) for sub in node)
+            elif t.isJoin(node):
+                stack.append((_FROM, node["Sx"], depth))
+                stack.append((_FROM, node["Dx"], depth))
+                stack.append((_EXPRESSION, node["On"], depth))
+            elif t.isSubQuery(node):
+                stack.append((_STATEMENT, node["Query"], depth))
+        elif t.isExpressionBoolean(node):
+            depth += 1
+            stack.extend((_EXPRESSION, sub, depth) for sub in node["Predicates"])
+        elif t.isExpressionSxDx(node):
+            for operand in (node["Sx"], node["Dx"]):
+                if t.isScalarSubQuery(operand):
+                    stack.append((_STATEMENT, operand["Query"], depth))
+        elif t.isExpressionIn(node) or t.isExpressionExists(node):
+            stack.append((_STATEMENT, node["Query"], depth))
+        yield kind, node, depth
+
+
+def _is_predicate(expression: Any) -> bool:
+    return t.isExpressionSxDx(expression) or t.isExpressionIn(expression) or t.isExpressionExists(expression)
+
+
+def _from_tables(clause: Any) -> Iterator[t.Identifier]:
+    "Tables read by a From clause itself, not by its subqueries."
+    stack = [clause]
+    while stack:
+        clause = stack.pop()
+        if t.isTableName(clause):
+            yield clause
+        elif t.isTableAlias(clause):
+            yield clause["Table"]
+        elif t.isTableNameList(clause):
+            stack.extend(clause)
+        elif t.isJoin(clause):
+            stack.extend((clause["Sx"], clause["Dx"]))
+
+
+def statement_cost(statement: t.Statement) -> Tuple[int, int]:
+    "(predicates, depth) of statement, see the module documentation."
+    predicates = depth = 0
+    for kind, node, node_depth in _iter_nodes(statement):
+        if kind == _EXPRESSION and _is_predicate(node):
+            predicates += 1
+        depth = max(depth, node_depth)
+    return predicates, depth
+
+
+class CostGuards:
+    def __init__(
+        self,
+        max_predicates: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        limit_required_on: Iterable[t.Identifier] = (),
+        max_size: Optional[int] = None,
+    ):
+        self.max_predicates = max_predicates
+        self.max_depth = max_depth
+        self.limit_required_on = {table.lower() for table in limit_required_on}
+        self.max_size = max_size
+
+    def check(self, statement: t.Statement):
+        "Raise GuardError if statement breaks the structural guards."
+        if self.max_predicates is not None or self.max_depth is not None:
+            predicates, depth = statement_cost(statement)
+            if self.max_predicates is not None and predicates > self.max_predicates:
+                raise GuardError(f"{predicates} predicates, at most {self.max_predicates} allowed")
+            if self.max_depth is not None and depth > self.max_depth:
+                raise GuardError(f"Nesting depth {depth}, at most {self.max_depth} allowed")
+
+        if self.limit_required_on:
+            for kind, node, _ in _iter_nodes(statement):
+                if kind != _STATEMENT or not t.isSelectStatement(node) or "Limit" in node:
+                    continue
+                for table in _from_tables(node.get("From")):
+                    if table.lower() in self.limit_required_on:
+                        raise GuardError(f'Select from "{table}" requires a Limit')
+
+    def check_sql(self, sql: str):
+        "Raise GuardError if the compiled statement is too long."
+        if self.max_size is not None and len(sql) > self.max_size:
+            raise GuardError(f"Statement of {len(sql)} characters, at most {self.max_size} allowed")
@@ -0,0 +1,78 @@
+import unittest
+
+import dict2sql
+import dict2sql.types as t
+from dict2sql.guards import CostGuards, GuardError, statement_cost
+
+
+def _track_ids(n: int) -> t.SelectStatement:
+    return {
+        "Select": "Name",
+        "From": "Track",
+        "Where": {"Op": "OR", "Predicates": [{"Op": "=", "Sx": "TrackId", "Dx": str(i)} for i in range(n)]},
+    }
+
+
+def _nested(in_query: t.SelectStatement) -> t.SelectStatement:
+    return {
+        "Select": "Name",
+        "From": {"Alias": "t", "Query": {"Select": ["Name", "TrackId"], "From": "Track"}},
+        "Where": {
+            "Op": "AND",
+            "Predicates": [
+                {"Op": ">", "Sx": "TrackId", "Dx": "10"},
+                {"Op": "IN", "Sx": "TrackId", "Query": in_query},
+            ],
+        },
+        "Limit": 10,
+    }
+
+
+_NESTED = _nested({"Select": "TrackId", "From": "InvoiceLine"})
+
+
+class TestCostGuards(unittest.TestCase):
+    def test_statement_cost(self):
+        self.assertEqual(statement_cost({"Select": "Name", "From": "Track"}), (0, 1))
+        self.assertEqual(statement_cost(_track_ids(3)), (3, 2))
+        # The IN subquery is in an AND, one level deeper than the FROM subquery
+        self.assertEqual(statement_cost(_NESTED), (2, 3))
+
+    def test_predicates(self):
+        guards = CostGuards(max_predicates=100)
+        guards.check(_track_ids(100))
+        with self.assertRaises(GuardError):
+            guards.check(_track_ids(100000))
+
+    def test_depth(self):
+        CostGuards(max_depth=3).check(_NESTED)
+        with self.assertRaises(GuardError):
+            CostGuards(max_depth=2).check(_NESTED)
+
+    def test_deep(self):
+        where: t.WhereClause = {"Op": "=", "Sx": "TrackId", "Dx": "1"}
+        for _ in range(5000):
+            where = {"Op": "AND", "Predicates": [where]}
+        statement: t.SelectStatement = {"Select": "Name", "From": "Track", "Where": where}
+        self.assertEqual(statement_cost(statement), (1, 5001))
+        with self.assertRaises(GuardError):
+            CostGuards(max_depth=10).check(statement)
+
+    def test_limit_required(self):
+        guards = CostGuards(limit_required_on=["InvoiceLine"])
+        guards.check({"Select": "Name", "From": "Track"})
+        guards.check({"Select": "*", "From": "InvoiceLine", "Limit": 10})
+        with self.assertRaises(GuardError):
+            guards.check({"Select": "*", "From": {"Table": "invoiceline", "Alias": "il"}})
+        # The Limit of the outer query does not bound the IN subquery
+        with self.assertRaises(GuardError):
+            guards.check(_NESTED)
+        guards.check(_nested({"Select": "TrackId", "From": "InvoiceLine", "Limit": 100}))
+
+    def test_to_sql(self):
+        compiler = dict2sql.dict2sql(guards=CostGuards(max_predicates=10, max_size=200))
+        compiler.to_sql(_track_ids(5))
+        with self.assertRaises(GuardError):
+            compiler.to_sql(_track_ids(11))
+        with self.assertRaises(GuardError):
+            compiler.to_sql({"Select": ["Name"] * 100, "From": "Track"})
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import dict2sql
+from dict2sql.dialects import load_dialect, register_dialect
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# `import dict2sql` may take this many times as long as `import typing`,
+# which it needs anyway; both are timed in the same run, so the budget does
+# not depend on the speed of the machine. Importing the compiler eagerly
+# takes about 1.8 times as long, the deferred imports about 1.15 times.
+IMPORT_BUDGET_RATIO = 1.5
+
+_DEFERRED = ["dict2sql.dialects.ansi.statement", "dict2sql.dialects.ansi.utils", "typing_extensions", "pprint"]
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+    )
+
+
+def _import_time_us(module: str) -> int:
+    "Cumulative import time of module, as reported by -X importtime"
+    # Without site (-S), which may import typing and more on its own
+    stderr = _python("-S", "-X", "importtime", "-c", f"import {module}").stderr
+    for line in stderr.splitlines():
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+
+class TestImportTime(unittest.TestCase):
+    def test_deferred_modules(self):
+        code = "import sys, dict2sql; print(' '.join(sorted(sys.modules)))"
+        modules = _python("-c", code).stdout.split()
+        for module in _DEFERRED:
+            self.assertNotIn(module, modules)
+
+    def test_budget(self):
+        # Best of a few interleaved runs, to be robust to a busy machine
+        runs = [(_import_time_us("dict2sql"), _import_time_us("typing")) for _ in range(3)]
+        best = min(own for own, _ in runs)
+        reference = min(typing for _, typing in runs)
+        self.assertLess(best, IMPORT_BUDGET_RATIO * reference)
+
+
+class TestDialects(unittest.TestCase):
+    def test_lazy_compile(self):
+        compiler = dict2sql.dict2sql(dialect="sqlite")
+        self.assertEqual(compiler.to_sql({"Select": "Name", "From": "Artist"}), 'SELECT Name FROM "Artist"')
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            dict2sql.dict2sql(dialect="nosuchdialect")
+
+    def test_register(self):
+        register_dialect("custom", "dict2sql.dialects.ansi.statement:Statement", "dict2sql.dialects.ansi.utils:Utils")
+        self.assertIs(load_dialect("custom").Statement, load_dialect("ansi").Statement)
+        self.assertIs(load_dialect("custom"), load_dialect("custom"))
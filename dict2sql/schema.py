@@ -0,0 +1,243 @@
+"""
+Validate the identifiers of a statement against the schema of a database,
+so that misspelled tables and columns are reported before the statement is
+sent, rather than by the database halfway through a batch.
+
+The Catalog reads the schema of a SQLite connection once (from sqlite_master
+and PRAGMA table_info) and keeps, for every table, the set of its column
+names; call refresh() after the schema changes. Identifiers are compared
+case-insensitively, as SQLite does.
+
+Columns are resolved through the tables visible from the clause they appear
+in, including the ones of enclosing queries (for correlated subqueries).
+When a visible table has unknown columns (a subquery in FROM, or a common
+table expression without Columns) unqualified columns cannot be checked and
+are accepted.
+"""
+import sqlite3
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Union
+
+import dict2sql.types as t
+from dict2sql.walker import parse_column_reference
+
+# Columns of a table, None when they are not known
+_Columns = Optional[FrozenSet[str]]
+
+
+class SchemaError(ValueError):
+    "A statement references tables or columns missing from the database."
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+class Catalog:
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+        self._columns: Optional[Dict[str, FrozenSet[str]]] = None
+        self._types: Dict[str, Dict[str, str]] = {}
+
+    def refresh(self):
+        "Read the schema of the database again."
+        names = [
+            row[0]
+            for row in self.db.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'"
+            )
+        ]
+        columns: Dict[str, FrozenSet[str]] = {}
+        types: Dict[str, Dict[str, str]] = {}
+        for name in names:
+            quoted = name.replace('"', '""')
+            info = self.db.execute(f'PRAGMA table_info("{quoted}")').fetchall()
+            # (cid, name, type, notnull, dflt_value, pk)
+            types[name.lower()] = {row[1]: row[2] for row in info}
+            columns[name.lower()] = frozenset(row[1].lower() for row in info)
+        self._columns = columns
+        self._types = types
+
+    @property
+    def tables(self) -> Dict[str, FrozenSet[str]]:
+        "Lowercase table name -> set of lowercase column names."
+        if self._columns is None:
+            self.refresh()
+        assert self._columns is not None
+        return self._columns
+
+    def columns(self, table: t.Identifier) -> _Columns:
+        return self.tables.get(table.lower())
+
+    def column_types(self, table: t.Identifier) -> Dict[str, str]:
+        "Column name -> declared type (possibly empty) of table."
+        if self._columns is None:
+            self.refresh()
+        return dict(self._types.get(table.lower(), {}))
+
+    def problems(self, statement: t.Statement) -> List[str]:
+        "Descriptions of the unknown identifiers of statement."
+        checker = _Checker(self)
+        checker.statement(statement, None)
+        return checker.problems
+
+    def validate(self, statement: t.Statement):
+        "Raise SchemaError if statement references unknown tables or columns."
+        problems = self.problems(statement)
+        if problems:
+            raise SchemaError(problems)
+
+
+class _Scope:
+    def __init__(self, outer: Optional["_Scope"]):
+        self.outer = outer
+        # Table name or alias -> columns
+        self.names: Dict[str, _Columns] = {}
+        # Union of the known columns of the tables in names
+        self.columns: Set[str] = set()
+        # Some table in names has unknown columns
+        self.opaque = False
+        self.ctes: Dict[str, _Columns] = {}
+        self.select_aliases: Set[str] = set()
+
+    def add(self, name: t.Identifier, columns: _Columns):
+        self.names[name.lower()] = columns
+        if columns is None:
+            self.opaque = True
+        else:
+            self.columns |= columns
+
+    def find_cte(self, name: str) -> Optional["_Scope"]:
+        "The scope defining the common table expression name, if any."
+        scope: Optional[_Scope] = self
+        while scope is not None and name not in scope.ctes:
+            scope = scope.outer
+        return scope
+
+
+class _Checker:
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        self.problems: List[str] = []
+
+    def table(self, name: t.Identifier, scope: _Scope) -> _Columns:
+        defining = scope.find_cte(name.lower())
+        if defining is not None:
+            return defining.ctes[name.lower()]
+        columns = self.catalog.columns(name)
+        if columns is None:
+            self.problems.append(f'Unknown table "{name}"')
+        return columns
+
+    def column(self, literal: Any, scope: _Scope):
+        ref = parse_column_reference(literal)
+        if ref is None:
+            return
+        column = ref.column.lower()
+        current: Optional[_Scope] = scope
+        if ref.table is None:
+            while current is not None:
+                if current.opaque or column in current.columns or column in current.select_aliases:
+                    return
+                current = current.outer
+            self.problems.append(f'Unknown column "{ref.column}"')
+            return
+        table = ref.table.lower()
+        while current is not None:
+            if table in current.names:
+                columns = current.names[table]
+                if columns is not None and column not in columns:
+                    self.problems.append(f'Unknown column "{ref.column}" in "{ref.table}"')
+                return
+            current = current.outer
+        self.problems.append(f'Unknown table "{ref.table}" in "{literal}"')
+
+    def operand(self, operand: Any, scope: _Scope):
+        if t.isAggregate(operand):
+            self.column(operand["Expression"], scope)
+        elif t.isScalarSubQuery(operand):
+            self.statement(operand["Query"], scope)
+        elif not isinstance(operand, dict):
+            self.column(operand, scope)
+
+    def expression(self, expression: Any, scope: _Scope):
+        if not isinstance(expression, dict):
+            self.column(expression, scope)
+        elif t.isExpressionBoolean(expression):
+            for sub in expression["Predicates"]:
+                self.expression(sub, scope)
+        elif t.isExpressionSxDx(expression):
+            self.operand(expression["Sx"], scope)
+            self.operand(expression["Dx"], scope)
+        elif t.isExpressionIn(expression):
+            self.operand(expression["Sx"], scope)
+            self.statement(expression["Query"], scope)
+        elif t.isExpressionExists(expression):
+            self.statement(expression["Query"], scope)
+
+    def from_clause(self, clause: Any, scope: _Scope):
+        if t.isTableName(clause):
+            scope.add(clause, self.table(clause, scope))
+        elif t.isTableNameList(clause):
+            for sub in clause:
+                self.from_clause(sub, scope)
+        elif t.isTableAlias(clause):
+            scope.add(clause["Alias"], self.table(clause["Table"], scope))
+        elif t.isJoin(clause):
+            self.from_clause(clause["Sx"], scope)
+            self.from_clause(clause["Dx"], scope)
+            self.expression(clause["On"], scope)
+        elif t.isSubQuery(clause):
+            self.statement(clause["Query"], scope)
+            scope.add(clause["Alias"], None)
+
+    def value_map_keys(self, data: Any, table: t.Identifier, columns: _Columns):
+        rows = data if t.isValueMapList(data) else [data]
+        if columns is None:
+            return
+        for key in {key for row in rows for key in row}:
+            if key.lower() not in columns:
+                self.problems.append(f'Unknown column "{key}" in "{table}"')
+
+    def statement(self, statement: t.Statement, outer: Optional[_Scope]):
+        scope = _Scope(outer)
+        for cte in statement.get("With", []):
+            name = cte["Name"].lower()
+            scope.ctes[name] = frozenset(c.lower() for c in cte["Columns"]) if "Columns" in cte else None
+            self.statement(cte["Query"], scope)
+            if "Recursive" in cte:
+                self.statement(cte["Recursive"], scope)
+
+        clause: Union[t.InsertClause, t.ValueClause, t.DeleteClause, None] = None
+        if "Select" in statement:
+            if "From" in statement:
+                self.from_clause(statement["From"], scope)
+            select = statement["Select"]
+            for item in select if isinstance(select, list) else [select]:
+                if isinstance(item, str):
+                    self.column(item, scope)
+                else:
+                    self.column(item["Expression"], scope)
+                    if "Alias" in item:
+                        scope.select_aliases.add(item["Alias"].lower())
+        elif "Insert" in statement:
+            clause = statement["Insert"]
+        elif "Update" in statement:
+            clause = statement["Update"]
+        elif "Delete" in statement:
+            clause = statement["Delete"]
+
+        if clause is not None:
+            table = clause["Table"]
+            columns = self.table(table, scope)
+            scope.add(table, columns)
+            if "Data" in clause:
+                self.value_map_keys(clause["Data"], table, columns)
+
+        if "Where" in statement:
+            self.expression(statement["Where"], scope)
+        for key in ("GroupBy", "Returning"):
+            columns = statement.get(key, [])
+            for column in columns if isinstance(columns, list) else [columns]:
+                self.column(column, scope)
+        if "Having" in statement:
+            self.expression(statement["Having"], scope)
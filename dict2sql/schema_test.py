@@ -0,0 +1,95 @@
+import unittest
+
+import dict2sql
+import dict2sql.types as t
+from dict2sql.schema import Catalog, SchemaError
+from dict2sql.test_fixtures.utils import open_sqlite_in_memory
+
+_CUSTOMERS_WITH_INVOICES: t.SelectStatement = {
+    "Select": ["c.FirstName", "LastName"],
+    "From": {"Table": "Customer", "Alias": "c"},
+    "Where": {
+        "Op": "AND",
+        "Predicates": [
+            {"Op": "=", "Sx": "c.country", "Dx": {"Type": "Quoted", "Expression": "Canada"}},
+            {
+                "Op": "EXISTS",
+                "Query": {
+                    "Select": "InvoiceId",
+                    "From": "Invoice",
+                    "Where": {"Op": "=", "Sx": "Invoice.CustomerId", "Dx": "c.CustomerId"},
+                },
+            },
+        ],
+    },
+}
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.db = open_sqlite_in_memory()
+        self.catalog = Catalog(self.db)
+
+    def test_introspection(self):
+        self.assertEqual(len(self.catalog.tables), 11)
+        self.assertIn("trackid", self.catalog.tables["invoiceline"])
+        self.assertEqual(self.catalog.column_types("Track")["Milliseconds"], "INTEGER")
+        self.assertIsNone(self.catalog.columns("Nope"))
+
+    def test_refresh(self):
+        self.catalog.tables
+        self.db.execute("CREATE TABLE Review (ReviewId INTEGER, Body TEXT)")
+        self.assertIsNone(self.catalog.columns("Review"))
+        self.catalog.refresh()
+        self.assertEqual(self.catalog.columns("Review"), {"reviewid", "body"})
+
+    def test_valid(self):
+        self.catalog.validate(_CUSTOMERS_WITH_INVOICES)
+        self.catalog.validate(
+            {
+                "With": [{"Name": "big", "Columns": ["Id"], "Query": {"Select": "InvoiceId", "From": "Invoice"}}],
+                "Select": [{"Aggregate": "COUNT", "Expression": "*", "Alias": "n"}, "big.Id"],
+                "From": ["big", {"Alias": "sub", "Query": {"Select": "Name", "From": "Artist"}}],
+                "GroupBy": "Id",
+                "Having": {"Op": ">", "Sx": "n", "Dx": "1"},
+            }
+        )
+        self.catalog.validate({"Insert": {"Table": "Artist", "Data": [{"ArtistId": "1000", "Name": "x"}]}})
+        self.catalog.validate({"Update": {"Table": "Artist", "Data": {"Name": "x"}}, "Where": "ArtistId"})
+        self.catalog.validate({"Delete": {"Table": "Artist"}, "Where": {"Op": "=", "Sx": "ArtistId", "Dx": "1"}})
+
+    def test_problems(self):
+        self.assertEqual(self.catalog.problems({"Select": "Name", "From": "Artists"}), ['Unknown table "Artists"'])
+        self.assertEqual(
+            self.catalog.problems(
+                {
+                    "Select": ["Nme", "Track.Title", "x.Name"],
+                    "From": "Track",
+                    "Where": {"Op": ">", "Sx": {"Aggregate": "MAX", "Expression": "Bytez"}, "Dx": "1"},
+                }
+            ),
+            [
+                'Unknown column "Nme"',
+                'Unknown column "Title" in "Track"',
+                'Unknown table "x" in "x.Name"',
+                'Unknown column "Bytez"',
+            ],
+        )
+        self.assertEqual(
+            self.catalog.problems({"Insert": {"Table": "Artist", "Data": {"Nmae": "x"}}}),
+            ['Unknown column "Nmae" in "Artist"'],
+        )
+        self.assertEqual(
+            self.catalog.problems(
+                {"Delete": {"Table": "Artist"}, "Where": {"Op": "=", "Sx": "Id", "Dx": "1"}, "Returning": "Nme"}
+            ),
+            ['Unknown column "Id"', 'Unknown column "Nme"'],
+        )
+
+    def test_to_sql(self):
+        compiler = dict2sql.dict2sql(catalog=self.catalog)
+        sql = compiler.to_sql(_CUSTOMERS_WITH_INVOICES)
+        self.assertEqual(len(self.db.execute(sql).fetchall()), 8)
+        with self.assertRaises(SchemaError) as cm:
+            compiler.to_sql({"Update": {"Table": "Artist", "Data": {"Nmae": "x"}}})
+        self.assertEqual(cm.exception.problems, ['Unknown column "Nmae" in "Artist"'])
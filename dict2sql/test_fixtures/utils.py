@@ -1,5 +1,6 @@
 import os
 import platform
+import shutil
 import sqlite3
 
 python_version = platform.python_version_tuple()
@@ -21,3 +22,10 @@ else:
         with open(filepath, "rb") as f:
             memory_db = sqlite3.connect(database=f.read())
         return memory_db
+
+
+def copy_sqlite_to_disk(directory: str, filepath: str = "dict2sql/test_fixtures/chinhook.sqlite3") -> str:
+    "Copy the fixture database into directory, return the path of the copy."
+    destination = os.path.join(directory, os.path.basename(filepath))
+    shutil.copyfile(filepath, destination)
+    return destination
@@ -5,9 +5,14 @@ They are part of the public interface for this module.
 Types that need it, have a corresponding isType function, which is used
 to disambiguate types at runtime.
 """
+import sys
 from typing import Any, Callable, Dict, Iterable, List, Union
 
-from typing_extensions import Literal, TypedDict
+# typing_extensions is only needed (and imported) before Python 3.8
+if sys.version_info >= (3, 8):
+    from typing import Literal, TypedDict
+else:
+    from typing_extensions import Literal, TypedDict
 
 # Basic types
 
@@ -49,9 +54,31 @@ def isTableNameList(obj: Any):
     return isinstance(obj, list)
 
 
+# Aggregates
+
+AggregateFunction = Literal["COUNT", "SUM", "AVG", "MIN", "MAX"]
+
+
+class _AggregateRequired(TypedDict):
+    Aggregate: AggregateFunction
+    # Column name, or "*"
+    Expression: Identifier
+
+
+class Aggregate(_AggregateRequired, total=False):
+    Distinct: bool
+    # Only meaningful in the Select clause
+    Alias: Identifier
+
+
+def isAggregate(obj: Any):
+    return isinstance(obj, dict) and "Aggregate" in obj
+
+
 # Select Clause
 
-SelectClause = Union[Identifier, ColNameList]
+SelectClauseSub = Union[Identifier, Aggregate]
+SelectClause = Union[SelectClauseSub, List[SelectClauseSub]]
 
 # From Clause
 
@@ -76,7 +103,16 @@ def isJoin(obj: Any):
     return isinstance(obj, dict) and "Join" in obj
 
 
-FromClauseSub = Union["SubQuery", Identifier, JoinClause]
+class TableAlias(TypedDict):
+    Table: Identifier
+    Alias: Identifier
+
+
+def isTableAlias(obj: Any):
+    return isinstance(obj, dict) and "Table" in obj and "Alias" in obj
+
+
+FromClauseSub = Union["SubQuery", TableAlias, Identifier, JoinClause]
 FromClause = Union[FromClauseSub, List[FromClauseSub]]
 
 # Where Clause
@@ -110,16 +146,16 @@ ExpressionSxDxOp = Literal["=", "<", ">", "<=", ">="]
 
 class ExpressionSxDx(TypedDict):
     Op: ExpressionSxDxOp
-    Sx: ExpressionLiteral
-    Dx: ExpressionLiteral
+    Sx: Union[ExpressionLiteral, Aggregate, "ScalarSubQuery"]
+    Dx: Union[ExpressionLiteral, Aggregate, "ScalarSubQuery"]
 
 
-def isExpressionSxDx(clause: "Expression"):
-    return "Op" in clause and clause["Op"] in ["=", "<", ">", "<=", ">="]
+def isExpressionSxDx(clause: Any):
+    return isinstance(clause, dict) and "Op" in clause and clause["Op"] in ["=", "<", ">", "<=", ">="]
 
 
 ExpressionBooleanOp = Literal["OR", "AND"]
-ExpressionBooleanPredicates = List["Expression"]
+ExpressionBooleanPredicates = List[Union["Expression", "ExpressionRaw"]]
 
 
 class ExpressionBoolean(TypedDict):
@@ -127,14 +163,57 @@ class ExpressionBoolean(TypedDict):
     Predicates: ExpressionBooleanPredicates
 
 
-def isExpressionBoolean(clause: "Expression"):
-    return "Op" in clause and clause["Op"] in ["OR", "AND"]
+def isExpressionBoolean(clause: Any):
+    return isinstance(clause, dict) and "Op" in clause and clause["Op"] in ["OR", "AND"]
+
+
+ExpressionExistsOp = Literal["EXISTS", "NOT EXISTS"]
+
+
+class ExpressionExists(TypedDict):
+    Op: ExpressionExistsOp
+    Query: "SelectStatement"
+
+
+def isExpressionExists(clause: Any):
+    return isinstance(clause, dict) and "Op" in clause and clause["Op"] in ["EXISTS", "NOT EXISTS"]
+
+
+ExpressionInOp = Literal["IN", "NOT IN"]
+
+
+class ExpressionIn(TypedDict):
+    Op: ExpressionInOp
+    Sx: ExpressionLiteral
+    Query: "SelectStatement"
+
+
+def isExpressionIn(clause: Any):
+    return isinstance(clause, dict) and "Op" in clause and clause["Op"] in ["IN", "NOT IN"]
+
+
+class ScalarSubQuery(TypedDict):
+    Query: "SelectStatement"
+
 
+def isScalarSubQuery(obj: Any):
+    return isinstance(obj, dict) and "Query" in obj and "Op" not in obj and "Alias" not in obj
 
-Expression = Union[ExpressionBoolean, ExpressionSxDx]
 
+Expression = Union[ExpressionBoolean, ExpressionSxDx, ExpressionExists, ExpressionIn]
+# Raw SQL text is accepted wherever an expression is, e.g. "GenreId = 25"
+ExpressionRaw = ExpressionLiteralSimple
 
-WhereClause = Expression
+
+WhereClause = Union[Expression, ExpressionRaw]
+
+# Group By Clause
+
+GroupByClause = Union[Identifier, ColNameList]
+
+# Having Clause
+
+HavingClause = Union[Expression, ExpressionRaw]
 
 # Limit Clause
 
@@ -145,13 +224,47 @@ def isLimitClause(clause: Any):
     return isinstance(clause, int)
 
 
+# With Clause
+
+CommonTableExpressionUnion = Literal["UNION", "UNION ALL"]
+
+
+class _CommonTableExpressionRequired(TypedDict):
+    Name: Identifier
+    Query: "SelectStatement"
+
+
+class CommonTableExpression(_CommonTableExpressionRequired, total=False):
+    Columns: ColNameList
+    # Recursive term, combined with Query by Union (default: UNION ALL)
+    Recursive: "SelectStatement"
+    Union: CommonTableExpressionUnion
+    # True for MATERIALIZED, False for NOT MATERIALIZED, absent to let the database decide
+    Materialized: bool
+
+
+WithClause = List[CommonTableExpression]
+
+
+def isWithClause(obj: Any):
+    return isinstance(obj, list)
+
+
+# Returning Clause
+
+# Columns of the written rows to return, or "*"
+ReturningClause = Union[Identifier, ColNameList]
+
 # Select Statement
 
 
 class SelectStatement(TypedDict, total=False):
+    With: WithClause
     Select: SelectClause
     From: FromClause
     Where: WhereClause
+    GroupBy: GroupByClause
+    Having: HavingClause
     Limit: LimitClause
 
 
@@ -165,21 +278,43 @@ class SubQuery(TypedDict):
 
 
 def isSubQuery(obj: Any):
-    return isinstance(obj, dict) and "Alias" in obj
+    return isinstance(obj, dict) and "Alias" in obj and "Query" in obj
 
 
 # Insert statement
 
 ValueMap = Dict[Identifier, Any]
 
+
+def isValueMap(obj: Any):
+    return isinstance(obj, dict)
+
+
+# Every row has to provide the same columns
+ValueMapList = List[ValueMap]
+
+
+def isValueMapList(obj: Any):
+    return isinstance(obj, list)
+
+
 # TODO: find better name
 class ValueClause(TypedDict):
     Table: Identifier
     Data: ValueMap
 
 
-class InsertStatement(TypedDict):
-    Insert: ValueClause
+class InsertClause(TypedDict):
+    Table: Identifier
+    Data: Union[ValueMap, ValueMapList]
+
+
+class _InsertStatementRequired(TypedDict):
+    Insert: InsertClause
+
+
+class InsertStatement(_InsertStatementRequired, total=False):
+    Returning: ReturningClause
 
 
 def isInsertStatement(obj: Any):
@@ -190,8 +325,10 @@ def isInsertStatement(obj: Any):
 
 
 class UpdateStatement(TypedDict, total=False):
+    With: WithClause
     Update: ValueClause
     Where: WhereClause
+    Returning: ReturningClause
 
 
 def isUpdateStatement(obj: Any):
@@ -206,8 +343,10 @@ class DeleteClause(TypedDict):
 
 
 class DeleteStatement(TypedDict, total=False):
+    With: WithClause
     Delete: DeleteClause
     Where: WhereClause
+    Returning: ReturningClause
 
 
 def isDeleteStatement(obj: Any):
@@ -1,8 +1,5 @@
 import abc
-from typing import Iterable, TypeVar, Union
-
-# pyright: reportMissingTypeStubs=false
-import toolz
+from typing import Iterable, Iterator, TypeVar, Union
 
 from dict2sql.types import Identifier, Intermediate, SqlText
 
@@ -16,6 +13,8 @@ class Utils(abc.ABC):
     """
 
     flag_debug_produce_ir: bool
+    # Whether the dialect accepts the Returning clause
+    supports_returning: bool = False
 
     @abc.abstractmethod
     def __init__(self, flag_debug_produce_ir: bool = False):
@@ -67,13 +66,17 @@ _InterposeSeq = TypeVar("_InterposeSeq")
 
 
 def interpose(el: _InterposeElem, seq: Iterable[_InterposeSeq]) -> Iterable[Union[_InterposeElem, _InterposeSeq]]:
-    """
-    Introduce el between each pair of items on seq.
-    This function improves the type signature of toolz.interpose
-    """
+    "Introduce el between each pair of items on seq."
     if not seq:
         return []
-    # pyright: reportUnknownArgumentType=false
-    # pyright: reportUnknownVariableType=false
-    # pyright: reportUnknownMemberType=false
-    return toolz.interpose(el, seq)
+    return _interpose(el, seq)
+
+
+def _interpose(el: _InterposeElem, seq: Iterable[_InterposeSeq]) -> Iterator[Union[_InterposeElem, _InterposeSeq]]:
+    items = iter(seq)
+    for item in items:
+        yield item
+        break
+    for item in items:
+        yield el
+        yield item
@@ -0,0 +1,127 @@
+"""
+Helpers to inspect the data-structure representation of a statement
+without compiling it.
+
+A statement is decomposed into scopes: each scope corresponds to one
+SELECT/INSERT/UPDATE/DELETE body and holds the tables (or common table
+expressions) it reads from together with the comparison predicates found in
+its WHERE clause and in the ON conditions of its joins. Subqueries (in FROM,
+in WHERE predicates and in common table expressions) open a new scope.
+"""
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+import dict2sql.types as t
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+KEYWORDS = {"NULL", "TRUE", "FALSE", "CURRENT_DATE", "CURRENT_TIME", "CURRENT_TIMESTAMP"}
+
+# IN (subquery) probes the left-hand side for equality, like a semi-join
+EQUALITY_OPS = {"=", "IN"}
+RANGE_OPS = {"<", ">", "<=", ">="}
+
+
+class ColumnReference(NamedTuple):
+    table: Optional[t.Identifier]
+    column: t.Identifier
+
+
+class Predicate(NamedTuple):
+    op: str
+    sx: Any
+    dx: Any
+    # Either "Where" or "On"
+    origin: str
+
+
+class Scope(NamedTuple):
+    tables: List[t.Identifier]
+    predicates: List[Predicate]
+    # Alias -> table, for tables renamed in FROM
+    aliases: Dict[t.Identifier, t.Identifier]
+
+
+def parse_column_reference(literal: Any) -> Optional[ColumnReference]:
+    """
+    Interpret an expression literal as a (possibly table-qualified) column name.
+    Returns None for quoted strings, numbers and keywords.
+    """
+    if not t.isExpressionLiteralSimple(literal):
+        return None
+    if not _IDENTIFIER_RE.match(literal) or literal.upper() in KEYWORDS:
+        return None
+    if "." in literal:
+        table, column = literal.split(".", 1)
+        return ColumnReference(table, column)
+    return ColumnReference(None, literal)
+
+
+def _walk_operand(operand: Any) -> Iterator[Scope]:
+    if t.isScalarSubQuery(operand):
+        yield from iter_scopes(operand["Query"])
+
+
+def _walk_expression(expression: Any, origin: str, scope: Scope) -> Iterator[Scope]:
+    """
+    Flatten boolean expressions into the comparison predicates of scope,
+    yield the scopes of the subqueries found along the way.
+    """
+    if not isinstance(expression, dict):
+        return
+    if t.isExpressionBoolean(expression):
+        for sub in expression["Predicates"]:
+            yield from _walk_expression(sub, origin, scope)
+    elif t.isExpressionSxDx(expression):
+        scope.predicates.append(Predicate(expression["Op"], expression["Sx"], expression["Dx"], origin))
+        yield from _walk_operand(expression["Sx"])
+        yield from _walk_operand(expression["Dx"])
+    elif t.isExpressionIn(expression):
+        scope.predicates.append(Predicate(expression["Op"], expression["Sx"], expression["Query"], origin))
+        yield from iter_scopes(expression["Query"])
+    elif t.isExpressionExists(expression):
+        yield from iter_scopes(expression["Query"])
+
+
+def _walk_from(clause: Any, scope: Scope) -> Iterator[Scope]:
+    if t.isTableName(clause):
+        scope.tables.append(clause)
+    elif t.isTableNameList(clause):
+        for sub in clause:
+            yield from _walk_from(sub, scope)
+    elif t.isTableAlias(clause):
+        scope.tables.append(clause["Table"])
+        scope.aliases[clause["Alias"]] = clause["Table"]
+    elif t.isJoin(clause):
+        yield from _walk_from(clause["Sx"], scope)
+        yield from _walk_from(clause["Dx"], scope)
+        yield from _walk_expression(clause["On"], "On", scope)
+    elif t.isSubQuery(clause):
+        yield from iter_scopes(clause["Query"])
+
+
+def iter_scopes(statement: t.Statement) -> Iterator[Scope]:
+    "Yield the scope of statement followed by the scopes of its subqueries."
+    scope = Scope([], [], {})
+    nested: List[Scope] = []
+
+    for cte in statement.get("With", []):
+        nested.extend(iter_scopes(cte["Query"]))
+        if "Recursive" in cte:
+            nested.extend(iter_scopes(cte["Recursive"]))
+
+    # Tested with "in", which also narrows the type of statement
+    if "Select" in statement:
+        if "From" in statement:
+            nested.extend(_walk_from(statement["From"], scope))
+    elif "Insert" in statement:
+        scope.tables.append(statement["Insert"]["Table"])
+    elif "Update" in statement:
+        scope.tables.append(statement["Update"]["Table"])
+    elif "Delete" in statement:
+        scope.tables.append(statement["Delete"]["Table"])
+
+    if "Where" in statement:
+        nested.extend(_walk_expression(statement["Where"], "Where", scope))
+
+    yield scope
+    yield from nested